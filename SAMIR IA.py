@@ -1,2206 +1,3344 @@
-"""
-SAMIR IA.py: Script completo para el chatbot de Samir's Burgers
-Incluye las funcionalidades de WhatsApp (Selenium y enlace directo), generación de facturas Excel
-Todo integrado en un solo archivo - Optimizado para WhatsApp Web 2025
-"""
-
-import os
-import sys
-import json
-import time
-import datetime
-import re
-import logging
-import openai
-import urllib.parse
-import webbrowser
-from dotenv import load_dotenv
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.mime.base import MIMEBase
-from email import encoders
-
-# Para WhatsApp
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.keys import Keys  # Añadido para usar teclas en send_message
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
-
-# Para Excel
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from openpyxl.utils import get_column_letter
-
-# Para QR Code
-try:
-    import qrcode
-    QR_DISPONIBLE = True
-except ImportError:
-    QR_DISPONIBLE = False
-    print("AVISO: Para generar códigos QR, instala: pip install qrcode[pil]")
-
-try:
-    from openpyxl.drawing.image import Image  # Para el logo en Excel
-except ImportError:
-    print("Advertencia: No se pudo importar Image de openpyxl. El logo no se mostrará en las facturas.")
-    Image = None
-
-# Configuración de logging
-logging.basicConfig(level=logging.INFO, 
-                    format='%(asctime)s - %(levelname)s - %(message)s')
-logger = logging.getLogger(__name__)
-
-# Cargar variables de entorno (incluye API Key de OpenAI)
-load_dotenv()
-openai.api_key = os.getenv('OPENAI_API_KEY')
-
-# Constantes para la factura
-EMPRESA = "Samir's Burgers"
-NIT = "901.234.567-8"
-DIRECCION_EMPRESA = "Calle 123 #45-67, Medellín"
-TELEFONO_EMPRESA = "+57 300 123 4567"
-CORREO_EMPRESA = "samirs.burgers@gmail.com"
-LOGO_PATH = "logo.png"  # Ruta al logo de la empresa (opcional)
-
-###############################
-# PARTE 1: INTEGRACIÓN CON WHATSAPP
-###############################
-
-class WhatsAppBot:
-    def __init__(self, data_dir=None):
-        """
-        Inicializa el bot de WhatsApp Web con Selenium
-        
-        Args:
-            data_dir: Directorio para guardar la sesión de Chrome (para no escanear QR cada vez)
-        """
-        self.driver = None
-        self.data_dir = data_dir or os.path.join(os.getcwd(), "whatsapp_session")
-        
-        # Asegurar que existe el directorio para la sesión
-        if not os.path.exists(self.data_dir):
-            os.makedirs(self.data_dir)
-            
-        self._setup_driver()
-        
-    def _setup_driver(self):
-        """Configura el driver de Chrome con opciones para WhatsApp Web"""
-        chrome_options = Options()
-        chrome_options.add_argument(f"user-data-dir={self.data_dir}")
-        
-        # Opciones adicionales para mejorar la estabilidad
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--disable-notifications")
-        
-        try:
-            # Sintaxis actualizada para Selenium moderno
-            self.driver = webdriver.Chrome(
-                options=chrome_options
-            )
-            self.driver.maximize_window()
-        except Exception as e:
-            logger.error(f"Error al inicializar Chrome: {e}")
-            raise
-    
-    def _take_screenshot(self, filename):
-        """
-        Toma una captura de pantalla para debug
-        
-        Args:
-            filename: Nombre del archivo para guardar la captura
-        """
-        try:
-            screenshot_dir = "debug_screenshots"
-            if not os.path.exists(screenshot_dir):
-                os.makedirs(screenshot_dir)
-                
-            filepath = os.path.join(screenshot_dir, filename)
-            self.driver.save_screenshot(filepath)
-            logger.info(f"Captura de pantalla guardada: {filepath}")
-        except Exception as e:
-            logger.error(f"Error al tomar captura de pantalla: {e}")
-    
-    def start(self):
-        """Inicia WhatsApp Web y verifica la autenticación - Versión optimizada sin espera de QR"""
-        logger.info("Iniciando WhatsApp Web (modo rápido)...")
-        
-        try:
-            self.driver.get("https://web.whatsapp.com/")
-            
-            # Lista de posibles selectores que indican que WhatsApp Web está cargado
-            possible_selectors = [
-                "[data-testid='chat-list']",
-                "[data-testid='default-user']",
-                "[data-testid='search-tab']",
-                "[data-testid='menu-bar-menu']",
-                ".two",
-                "._3sh5K",
-                "#side",
-                "#pane-side"
-            ]
-            
-            # Tiempo máximo de espera: 15 segundos (asumiendo que ya está conectado)
-            wait_time = 15
-            print(f"Esperando a que cargue WhatsApp Web (máximo {wait_time} segundos)...")
-            
-            # Intentar cada selector
-            loaded = False
-            for selector in possible_selectors:
-                try:
-                    WebDriverWait(self.driver, wait_time).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    loaded = True
-                    logger.info(f"WhatsApp Web cargado correctamente (selector: {selector})")
-                    break
-                except:
-                    continue
-            
-            # Si ningún selector funcionó pero la URL cambió, considera que está cargado
-            if not loaded:
-                current_url = self.driver.current_url
-                if "web.whatsapp.com" in current_url and not "/welcome" in current_url:
-                    loaded = True
-                    logger.info("WhatsApp Web parece estar cargado basado en la URL")
-            
-            # Si no se pudo cargar, intentar una vez más con un tiempo de espera extendido
-            if not loaded:
-                logger.warning("No se detectó carga de WhatsApp Web. Verificando si necesita escanear QR...")
-                
-                # Tomar captura para ver si muestra código QR
-                self._take_screenshot("whatsapp_loading_screen.png")
-                
-                # Extender tiempo de espera si parece que está mostrando QR
-                extended_wait = 30
-                print(f"Es posible que necesites escanear el código QR. Espera {extended_wait} segundos adicionales...")
-                
-                time.sleep(extended_wait)
-                
-                # Verificar una vez más si ya está cargado
-                for selector in possible_selectors:
-                    try:
-                        if self.driver.find_element(By.CSS_SELECTOR, selector):
-                            loaded = True
-                            logger.info(f"WhatsApp Web cargado después de espera extendida")
-                            break
-                    except:
-                        continue
-            
-            if loaded:
-                return True
-            else:
-                logger.error("No se pudo detectar que WhatsApp Web haya cargado correctamente")
-                return False
-                
-        except Exception as e:
-            logger.error(f"Error al iniciar WhatsApp Web: {e}")
-            return False
-    
-    def find_chat(self, phone_number):
-        """
-        Busca o inicia un chat con un número específico en WhatsApp Web 2025
-        
-        Args:
-            phone_number: Número de teléfono con código de país (ej: "573042535003")
-        
-        Returns:
-            bool: True si se encontró/inició el chat, False en caso contrario
-        """
-        try:
-            # Limpiar el número y asegurar que tiene el formato correcto
-            clean_number = ''.join(filter(str.isdigit, phone_number))
-            
-            # Si no comienza con el código de país, añadirlo (Colombia = 57)
-            if not clean_number.startswith('57'):
-                clean_number = '57' + clean_number
-                
-            logger.info(f"Buscando chat para el número: {clean_number}")
-            
-            # Método 1: URL directa (método más confiable)
-            self.driver.get(f"https://web.whatsapp.com/send?phone={clean_number}")
-            logger.info("Navegando a URL directa de WhatsApp")
-            
-            # Esperar más tiempo (45 segundos) para cargar completamente
-            try:
-                # Intentar detectar panel de conversación con múltiples selectores posibles
-                selectors = [
-                    "[data-testid='conversation-panel-wrapper']",
-                    "[data-testid='msg-container']", 
-                    ".copyable-area",
-                    "#main",
-                    "[role='application']"
-                ]
-                
-                for selector in selectors:
-                    try:
-                        # Incrementar el tiempo de espera para dar más tiempo a la carga
-                        WebDriverWait(self.driver, 45).until(
-                            EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                        )
-                        logger.info(f"Chat abierto correctamente usando selector: {selector}")
-                        
-                        # Esperar un poco más para asegurar que se cargue completamente
-                        time.sleep(3)
-                        return True
-                    except:
-                        continue
-                        
-                # Si llegamos aquí, ninguno de los selectores funcionó
-                logger.warning("No se pudo detectar el panel de conversación con ningún selector conocido")
-            except Exception as e:
-                logger.warning(f"Método 1 falló: {e}")
-                
-            # Verificar si hay mensaje de error antes de continuar
-            try:
-                # Buscar textos de error comunes en la página
-                error_texts = [
-                    "El número de teléfono compartido a través del enlace",
-                    "El número de teléfono no existe",
-                    "número no está disponible",
-                    "invalid",
-                    "no se encuentra"
-                ]
-                
-                for error in error_texts:
-                    try:
-                        # Buscar por texto parcial
-                        error_element = self.driver.find_element(By.XPATH, f"//*[contains(text(), '{error}')]")
-                        if error_element:
-                            logger.error(f"WhatsApp indica que hay un problema con el número: {error}")
-                            return False
-                    except:
-                        pass
-            except:
-                pass
-            
-            # Método 2: Usar el campo de búsqueda
-            try:
-                # Volver a la página principal
-                self.driver.get("https://web.whatsapp.com/")
-                logger.info("Volviendo a la página principal para intentar búsqueda manual")
-                
-                # Esperar a que cargue la página principal
-                time.sleep(10)
-                
-                # Buscar el campo de búsqueda
-                search_selectors = [
-                    "[data-testid='chat-list-search']",
-                    "[data-testid='search-bar']", 
-                    "[title='Cuadro de texto de búsqueda']",
-                    "._3SZ1t"
-                ]
-                
-                search_box = None
-                for selector in search_selectors:
-                    try:
-                        search_box = WebDriverWait(self.driver, 15).until(
-                            EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                        )
-                        if search_box:
-                            logger.info(f"Campo de búsqueda encontrado con selector: {selector}")
-                            break
-                    except:
-                        continue
-                
-                if search_box:
-                    # Limpiar y usar el número
-                    search_box.clear()
-                    search_box.send_keys(clean_number)
-                    logger.info(f"Buscando número: {clean_number}")
-                    time.sleep(5)
-                    
-                    # Intentar hacer clic en el resultado (si existe)
-                    try:
-                        chat_results = self.driver.find_elements(By.CSS_SELECTOR, "div[role='row']")
-                        if chat_results and len(chat_results) > 0:
-                            chat_results[0].click()
-                            logger.info("Se hizo clic en el primer resultado de la búsqueda")
-                            time.sleep(5)
-                            return True
-                    except Exception as e:
-                        logger.warning(f"No se pudo hacer clic en el resultado: {e}")
-                else:
-                    logger.warning("No se pudo encontrar el campo de búsqueda")
-            except Exception as e:
-                logger.warning(f"Método 2 falló: {e}")
-             
-            # Método 3: Intentar buscar por el número exacto
-            try:
-                # Intentar encontrar directamente el chat por el número
-                chat_selector = f"//span[contains(@title, '{clean_number}')]"
-                chat_element = self.driver.find_element(By.XPATH, chat_selector)
-                if chat_element:
-                    chat_element.click()
-                    logger.info(f"Chat encontrado y seleccionado por número visible")
-                    time.sleep(3)
-                    return True
-            except:
-                logger.warning("No se pudo encontrar el chat directamente por número")
-                
-            # Si llegamos aquí, todos los métodos fallaron
-            logger.error("Todos los métodos para encontrar el chat fallaron")
-            return False
-        except Exception as e:
-            logger.error(f"Error general al buscar chat: {e}")
-            return False
-
-    def send_message(self, phone_number, message):
-        """
-        Envía un mensaje a un número específico
-        
-        Args:
-            phone_number: Número de teléfono con código de país
-            message: Mensaje a enviar
-            
-        Returns:
-            bool: True si se envió correctamente, False en caso contrario
-        """
-        try:
-            # Primero encontrar/abrir el chat
-            if not self.find_chat(phone_number):
-                logger.error("No se pudo abrir el chat para enviar mensaje")
-                return False
-                
-            # Esperar a que cargue la página completamente
-            time.sleep(5)
-            logger.info("Chat abierto, preparando para enviar mensaje...")
-            
-            # Intentar diferentes selectores para el campo de texto
-            input_box = None
-            input_selectors = [
-                "[data-testid='conversation-compose-box-input']",
-                "div[contenteditable='true'][data-tab='10']",
-                "div[contenteditable='true'][role='textbox']",
-                "div[role='textbox']",
-                "div.selectable-text[contenteditable='true']",
-                "#main div[contenteditable='true']"
-            ]
-            
-            for selector in input_selectors:
-                try:
-                    input_box = WebDriverWait(self.driver, 10).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    if input_box:
-                        logger.info(f"Campo de texto encontrado con selector: {selector}")
-                        break
-                except:
-                    continue
-            
-            if not input_box:
-                logger.error("No se pudo encontrar el campo de texto para enviar mensaje")
-                self._take_screenshot("error_send_message.png")
-                return False
-            
-            # Enviar el mensaje de una forma más robusta
-            try:
-                # Método 1: Enviar directamente
-                input_box.clear()
-                
-                # Enviar por partes para evitar errores
-                chunk_size = 50  # Enviar en trozos para evitar problemas
-                for i in range(0, len(message), chunk_size):
-                    chunk = message[i:i+chunk_size]
-                    input_box.send_keys(chunk)
-                    time.sleep(0.5)
-                    
-                # Tomar captura del momento antes de enviar
-                self._take_screenshot("before_send.png")
-                logger.info("Mensaje escrito correctamente, buscando botón de enviar...")
-                
-                # Buscar botón de enviar con múltiples selectores
-                send_button = None
-                send_selectors = [
-                    "[data-testid='compose-btn-send']",
-                    "[data-icon='send']",
-                    "[data-testid='send']",
-                    "[aria-label='Enviar']",
-                    "button[aria-label='Enviar']",
-                    "span[data-icon='send']"
-                ]
-                
-                for selector in send_selectors:
-                    try:
-                        send_button = WebDriverWait(self.driver, 5).until(
-                            EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                        )
-                        if send_button:
-                            logger.info(f"Botón de enviar encontrado con selector: {selector}")
-                            break
-                    except:
-                        continue
-                
-                if send_button:
-                    send_button.click()
-                    logger.info("Botón de enviar presionado")
-                else:
-                    # Alternativa: Usar tecla ENTER
-                    logger.info("Usando ENTER como alternativa para enviar")
-                    input_box.send_keys(Keys.ENTER)
-                
-                # Esperar a que se envíe el mensaje
-                time.sleep(3)
-                logger.info(f"Mensaje enviado correctamente a {phone_number}")
-                return True
-                
-            except Exception as e:
-                logger.error(f"Error al enviar el mensaje: {e}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"Error general en send_message: {e}")
-            return False
-    
-    def send_document(self, phone_number, file_path, caption=None):
-        """
-        Envía un documento (PDF, Excel, etc.) a un número específico por WhatsApp
-        
-        Args:
-            phone_number: Número de teléfono con código de país
-            file_path: Ruta absoluta al archivo para enviar
-            caption: Texto opcional para el documento
-            
-        Returns:
-            bool: True si se envió correctamente, False en caso contrario
-        """
-        try:
-            # Asegurar que el archivo existe
-            if not os.path.exists(file_path):
-                logger.error(f"Archivo no encontrado: {file_path}")
-                return False
-                
-            # Abrir chat
-            if not self.find_chat(phone_number):
-                logger.error("No se pudo abrir el chat para enviar documento")
-                return False
-            
-            # Tomar captura del chat abierto
-            self._take_screenshot("before_attach_document.png")
-            
-            # Esperar a que cargue completamente
-            time.sleep(5)
-                
-            # PASO 1: Encontrar y hacer clic en el botón de adjuntar (clip o +)
-            attach_button = None
-            attach_selectors = [
-                "[data-testid='attach-clip']",
-                "[data-testid='compose-btn-attach']",
-                "[data-icon='attach-menu-plus']",
-                "[data-icon='attach']",
-                "[data-icon='clip']",
-                "[aria-label='Adjuntar']",
-                "[title='Adjuntar']"
-            ]
-            
-            for selector in attach_selectors:
-                try:
-                    attach_button = WebDriverWait(self.driver, 10).until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                    )
-                    if attach_button:
-                        logger.info(f"Botón de adjuntar encontrado con selector: {selector}")
-                        break
-                except:
-                    continue
-                    
-            if not attach_button:
-                logger.error("No se pudo encontrar el botón para adjuntar archivos")
-                self._take_screenshot("error_no_attach_button.png")
-                return False
-                
-            # Hacer clic en el botón de adjuntar
-            attach_button.click()
-            logger.info("Clic en botón de adjuntar realizado")
-            time.sleep(2)
-            
-            # PASO 2: Buscar la opción de documento o el input de archivo directamente
-            # Primero intentar encontrar y hacer clic en la opción de documento si es necesario
-            document_option_selectors = [
-                "[data-testid='mi-attach-document']",
-                "[data-testid='attach-document']",
-                "[data-icon='document']", 
-                "[aria-label='Documento']"
-            ]
-            
-            document_option_found = False
-            for selector in document_option_selectors:
-                try:
-                    option = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    if option:
-                        option.click()
-                        logger.info(f"Opción de documento encontrada y seleccionada: {selector}")
-                        document_option_found = True
-                        time.sleep(2)
-                        break
-                except:
-                    continue
-            
-            # PASO 3: Buscar el input de tipo file para subir el archivo
-            try:
-                # Tomar captura antes de buscar el input
-                self._take_screenshot("before_file_input.png")
-                
-                file_input = WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='file']"))
-                )
-                
-                # Asegurar ruta absoluta y enviar al input
-                abs_file_path = os.path.abspath(file_path)
-                file_input.send_keys(abs_file_path)
-                logger.info(f"Archivo seleccionado: {abs_file_path}")
-                
-                # Esperar a que se cargue el archivo
-                time.sleep(5)
-                logger.info("Archivo cargado, buscando campo de comentario...")
-                
-                # PASO 4: Si hay caption, intentar escribirlo
-                if caption:
-                    try:
-                        caption_selectors = [
-                            "[data-testid='media-caption-input']",
-                            "[data-testid='media-caption-input-container']",
-                            "[data-testid='caption-input']",
-                            "div[role='textbox'][data-tab='9']",
-                            "[placeholder='Añade un comentario']"
-                        ]
-                        
-                        caption_field = None
-                        for selector in caption_selectors:
-                            try:
-                                caption_field = WebDriverWait(self.driver, 8).until(
-                                    EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                                )
-                                if caption_field:
-                                    logger.info(f"Campo de comentario encontrado: {selector}")
-                                    break
-                            except:
-                                continue
-                                
-                        if caption_field:
-                            caption_field.clear()
-                            caption_field.send_keys(caption)
-                            logger.info("Comentario agregado al archivo")
-                            
-                            # IMPORTANTE: Presionar ENTER después de escribir el comentario
-                            # Esta es la nueva línea que hemos agregado para usar Enter como alternativa
-                            caption_field.send_keys(Keys.ENTER)
-                            logger.info("Tecla ENTER presionada después del comentario")
-                            time.sleep(3)  # Esperar después de presionar Enter
-                            
-                            # Si el mensaje se envió con Enter, retornamos éxito
-                            try:
-                                # Verificar si seguimos en la pantalla de adjuntar o si ya se envió
-                                if not self.driver.find_elements(By.CSS_SELECTOR, "input[type='file']"):
-                                    logger.info("Documento enviado con Enter después del comentario")
-                                    time.sleep(2)
-                                    return True
-                            except:
-                                pass
-                        else:
-                            logger.warning("No se pudo encontrar el campo para agregar comentario")
-                    except Exception as e:
-                        logger.warning(f"Error al agregar comentario: {e}")
-                
-                # PASO 5: Buscar y hacer clic en el botón de enviar
-                send_selectors = [
-                    "[data-testid='send']",
-                    "[data-testid='btn-send']",
-                    "[aria-label='Enviar']",
-                    "[data-icon='send']",
-                    "span[data-icon='send']"
-                ]
-                
-                # Tomar captura antes de buscar el botón de enviar
-                self._take_screenshot("before_send_file.png")
-                
-                send_button = None
-                for selector in send_selectors:
-                    try:
-                        send_button = WebDriverWait(self.driver, 10).until(
-                            EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                        )
-                        if send_button:
-                            logger.info(f"Botón de enviar archivo encontrado: {selector}")
-                            break
-                    except:
-                        continue
-                        
-                if send_button:
-                    send_button.click()
-                    logger.info("Botón de enviar archivo presionado")
-                else:
-                    # ALTERNATIVA: Usar la tecla ENTER si no se encuentra el botón
-                    logger.info("No se encontró botón de enviar, intentando con ENTER...")
-                    
-                    # Intentar encontrar cualquier elemento interactivo y enviar Enter
-                    active_elements = [
-                        "div[role='textbox']",
-                        "[contenteditable='true']",
-                        ".copyable-text",
-                        "[data-tab='9']"
-                    ]
-                    
-                    element_for_enter = None
-                    for selector in active_elements:
-                        try:
-                            elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                            if elements and len(elements) > 0:
-                                element_for_enter = elements[0]
-                                break
-                        except:
-                            pass
-                    
-                    if element_for_enter:
-                        element_for_enter.send_keys(Keys.ENTER)
-                        logger.info("ENTER enviado a elemento activo")
-                    else:
-                        # Si no encontramos un elemento, intentar enviar Enter a la página
-                        actions = webdriver.ActionChains(self.driver)
-                        actions.send_keys(Keys.ENTER)
-                        actions.perform()
-                        logger.info("ENTER enviado a la página")
-                
-                # Esperar a que se envíe (archivos grandes pueden tardar más)
-                time.sleep(7)
-                logger.info(f"Documento enviado correctamente a {phone_number}")
-                return True
-                
-            except Exception as e:
-                logger.error(f"Error al seleccionar o enviar archivo: {e}")
-                self._take_screenshot("error_file_upload.png")
-                return False
-                
-        except Exception as e:
-            logger.error(f"Error general al enviar documento: {e}")
-            return False
-    
-    def send_image(self, phone_number, image_path, caption=None):
-        """
-        Envía una imagen a un número específico
-        
-        Args:
-            phone_number: Número de teléfono con código de país
-            image_path: Ruta absoluta a la imagen
-            caption: Texto opcional para la imagen
-            
-        Returns:
-            bool: True si se envió correctamente, False en caso contrario
-        """
-        try:
-            # Abrir chat
-            if not self.find_chat(phone_number):
-                return False
-            
-            # Hacer clic en el botón de adjuntar
-            attach_selectors = [
-                "[data-testid='attach-clip']",
-                "[data-testid='compose-btn-attach']",
-                "[data-icon='attach-menu-plus']",
-                "[data-icon='attach']",
-                "[data-icon='clip']",
-                "[aria-label='Adjuntar']",
-                "[title='Adjuntar']"
-            ]
-            
-            attach_button = None
-            for selector in attach_selectors:
-                try:
-                    attach_button = WebDriverWait(self.driver, 10).until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                    )
-                    if attach_button:
-                        break
-                except:
-                    continue
-                    
-            if not attach_button:
-                logger.error("No se pudo encontrar el botón para adjuntar")
-                return False
-                
-            attach_button.click()
-            
-            # Puede ser necesario seleccionar "Imagen" si hay un menú
-            image_option_selectors = [
-                "[data-testid='mi-attach-gallery']",
-                "[data-testid='attach-image']",
-                "[data-icon='image']",
-                "[aria-label='Foto o video']"
-            ]
-            
-            # Intentar hacer clic en la opción de imagen si existe
-            option_found = False
-            for selector in image_option_selectors:
-                try:
-                    option = WebDriverWait(self.driver, 3).until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                    )
-                    option.click()
-                    option_found = True
-                    time.sleep(1)
-                    break
-                except:
-                    continue
-            
-            # Seleccionar opción de imagen
-            image_input = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='file']"))
-            )
-            
-            # Enviar ruta de imagen al input
-            image_path = os.path.abspath(image_path)  # Asegurar ruta absoluta
-            image_input.send_keys(image_path)
-            
-            # Si hay caption, escribirlo
-            if caption:
-                caption_selectors = [
-                    "[data-testid='media-caption-input']",
-                    "[data-testid='media-caption-input-container']",
-                    "[data-testid='caption-input']",
-                    "div[role='textbox'][data-tab='9']",
-                    "[placeholder='Añade un comentario']"
-                ]
-                
-                caption_field = None
-                for selector in caption_selectors:
-                    try:
-                        caption_field = WebDriverWait(self.driver, 8).until(
-                            EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                        )
-                        if caption_field:
-                            break
-                    except:
-                        continue
-                        
-                if caption_field:
-                    caption_field.clear()
-                    caption_field.send_keys(caption)
-                    # Intentar con Enter
-                    caption_field.send_keys(Keys.ENTER)
-                    time.sleep(3)
-                    
-                    # Verificar si ya se envió
-                    try:
-                        # Si la pantalla de previsualización de imagen ya no está visible
-                        if not self.driver.find_elements(By.CSS_SELECTOR, "input[type='file']"):
-                            logger.info("Imagen enviada con Enter después del comentario")
-                            return True
-                    except:
-                        pass
-            
-            # Hacer clic en enviar
-            send_selectors = [
-                "[data-testid='send']",
-                "[data-testid='btn-send']",
-                "[aria-label='Enviar']",
-                "[data-icon='send']",
-                "span[data-icon='send']"
-            ]
-            
-            send_button = None
-            for selector in send_selectors:
-                try:
-                    send_button = WebDriverWait(self.driver, 10).until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                    )
-                    if send_button:
-                        break
-                except:
-                    continue
-                    
-            if send_button:
-                send_button.click()
-            else:
-                # Intentar con Enter directamente en la página
-                actions = webdriver.ActionChains(self.driver)
-                actions.send_keys(Keys.ENTER)
-                actions.perform()
-                logger.info("ENTER enviado a la página para enviar imagen")
-            
-            # Esperar a que se envíe
-            time.sleep(3)
-            logger.info(f"Imagen enviada correctamente a {phone_number}")
-            return True
-        except Exception as e:
-            logger.error(f"Error al enviar imagen a {phone_number}: {e}")
-            return False
-    
-    def close(self):
-        """Cierra el navegador y finaliza la sesión"""
-        if self.driver:
-            self.driver.quit()
-            logger.info("Sesión de WhatsApp cerrada")
-
-def send_whatsapp_message(phone_number, message):
-    """
-    Función de utilidad para enviar un mensaje de WhatsApp sin manejar el objeto bot
-    
-    Args:
-        phone_number: Número con código de país (ej: "573001234567")
-        message: Texto del mensaje a enviar
-        
-    Returns:
-        bool: True si se envió correctamente
-    """
-    bot = WhatsAppBot()
-    success = False
-    
-    try:
-        if bot.start():
-            success = bot.send_message(phone_number, message)
-    finally:
-        bot.close()
-        
-    return success
-
-def mensaje_whatsapp(datos_cliente, resumen_pedido):
-    """Genera el mensaje estándar para WhatsApp"""
-    return (
-        f"🍔 *SAMIR'S BURGERS - CONFIRMACIÓN DE PEDIDO* 🍔\n\n"
-        f"Hola *{datos_cliente['nombre']}*, ¡gracias por tu pedido!\n\n"
-        f"*📝 RESUMEN DE TU PEDIDO:*\n{resumen_pedido}\n\n"
-        f"*📍 DIRECCIÓN DE ENTREGA:*\n{datos_cliente['direccion']}\n\n"
-        f"*💰 MÉTODO DE PAGO:*\n{datos_cliente['metodo_pago']}\n\n"
-        f"Tu pedido está siendo preparado con todo el amor de Samir's Burgers. "
-        f"Si tienes alguna duda, responde a este mensaje.\n\n"
-        f"¡Buen provecho! 🍔✨"
-    )
-
-def enviar_pedido_por_whatsapp(telefono, resumen_pedido, datos_cliente):
-    """
-    Envía el resumen del pedido a un cliente por WhatsApp usando Selenium
-    
-    Args:
-        telefono: Número de teléfono del cliente (se le añadirá el código de país)
-        resumen_pedido: Texto con el resumen del pedido
-        datos_cliente: Diccionario con los datos del cliente
-        
-    Returns:
-        bool: True si se envió correctamente
-    """
-    # Formatear el número con código de país (Colombia por defecto)
-    # Eliminar cualquier formato (espacios, guiones, +)
-    clean_number = ''.join(filter(str.isdigit, telefono))
-    
-    # Si no comienza con el código de país, añadirlo
-    if not clean_number.startswith('57'):
-        clean_number = '57' + clean_number
-    
-    # Crear mensaje con formato
-    mensaje = mensaje_whatsapp(datos_cliente, resumen_pedido)
-    
-    # Enviar mensaje
-    return send_whatsapp_message(clean_number, mensaje)
-
-def enviar_factura_por_whatsapp(telefono, ruta_factura, datos_cliente, resumen_pedido):
-    """
-    Envía la factura Excel por WhatsApp
-    
-    Args:
-        telefono: Número de teléfono del cliente
-        ruta_factura: Ruta al archivo Excel de factura
-        datos_cliente: Datos del cliente
-        resumen_pedido: Texto del resumen del pedido
-        
-    Returns:
-        bool: True si se envió correctamente
-    """
-    # Formatear el número
-    clean_number = ''.join(filter(str.isdigit, telefono))
-    if not clean_number.startswith('57'):
-        clean_number = '57' + clean_number
-    
-    # Mensaje de factura
-    mensaje = (
-        f"🧾 *FACTURA SAMIR'S BURGERS* 🧾\n\n"
-        f"Hola *{datos_cliente['nombre']}*, a continuación te enviamos la factura de tu pedido.\n\n"
-        f"Si tienes alguna duda sobre tu factura, contáctanos al {TELEFONO_EMPRESA}.\n\n"
-        f"¡Gracias por tu compra!"
-    )
-    
-    # Crear instancia del bot
-    bot = WhatsAppBot()
-    success = False
-    
-    try:
-        if bot.start():
-            # Primero enviar un mensaje
-            bot.send_message(clean_number, mensaje)
-            
-            # Luego enviar el archivo Excel
-            caption = f"Factura Samir's Burgers - {datetime.datetime.now().strftime('%d/%m/%Y')}"
-            success = bot.send_document(clean_number, ruta_factura, caption)
-    except Exception as e:
-        logger.error(f"Error al enviar factura por WhatsApp: {e}")
-        success = False
-    finally:
-        bot.close()
-    
-    return success
-
-###############################
-# PARTE 1B: WHATSAPP DIRECTO (QR y Enlace)
-###############################
-
-def crear_enlace_whatsapp(numero, mensaje):
-    """
-    Crea un enlace de WhatsApp que abre directamente el chat con un mensaje predefinido
-    
-    Args:
-        numero: Número de teléfono (con código de país)
-        mensaje: Mensaje a enviar (será codificado para URL)
-        
-    Returns:
-        str: URL de WhatsApp
-    """
-    # Formatear el número
-    numero_limpio = ''.join(filter(str.isdigit, numero))
-    
-    # Si no comienza con el código de país, añadirlo (Colombia = 57)
-    if not numero_limpio.startswith('57'):
-        numero_limpio = '57' + numero_limpio
-    
-    # Codificar el mensaje para URL
-    mensaje_codificado = urllib.parse.quote(mensaje)
-    
-    # Crear el enlace (funciona tanto en móvil como en escritorio)
-    return f"https://wa.me/{numero_limpio}?text={mensaje_codificado}"
-
-def generar_qr_whatsapp(numero, mensaje, guardar=True):
-    """
-    Genera un código QR que al escanearse abre WhatsApp con un mensaje predefinido
-    
-    Args:
-        numero: Número de teléfono (con código de país)
-        mensaje: Mensaje a enviar 
-        guardar: Si es True, guarda el QR como imagen
-        
-    Returns:
-        str: Ruta a la imagen QR generada o None si no se guardó
-    """
-    if not QR_DISPONIBLE:
-        print("Error: Para generar códigos QR, instala: pip install qrcode[pil]")
-        return None
-        
-    try:
-        # Crear el enlace
-        enlace = crear_enlace_whatsapp(numero, mensaje)
-        
-        # Generar QR
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(enlace)
-        qr.make(fit=True)
-        
-        # Crear imagen
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        if guardar:
-            # Crear nombre de archivo con timestamp
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"whatsapp_qr_{timestamp}.png"
-            img.save(filename)
-            print(f"Código QR guardado como: {filename}")
-            return filename
-        else:
-            return None
-    except Exception as e:
-        print(f"Error al generar código QR: {e}")
-        return None
-
-def abrir_chat_directo(numero, mensaje):
-    """
-    Abre directamente el navegador predeterminado con el enlace de WhatsApp
-    
-    Args:
-        numero: Número de teléfono (con código de país)
-        mensaje: Mensaje a enviar
-        
-    Returns:
-        bool: True si se pudo abrir el navegador
-    """
-    try:
-        enlace = crear_enlace_whatsapp(numero, mensaje)
-        webbrowser.open(enlace)
-        print(f"Enlace de WhatsApp abierto: {enlace}")
-        return True
-    except Exception as e:
-        print(f"Error al abrir enlace de WhatsApp: {e}")
-        return False
-
-def enviar_pedido_whatsapp_directo(telefono, resumen_pedido, datos_cliente):
-    """
-    Crea un código QR y un enlace directo para enviar el pedido por WhatsApp
-    
-    Args:
-        telefono: Número de teléfono del cliente
-        resumen_pedido: Texto con el resumen del pedido
-        datos_cliente: Diccionario con los datos del cliente
-        
-    Returns:
-        dict: Diccionario con enlace, ruta del QR y éxito de apertura
-    """
-    # Crear mensaje formateado
-    mensaje = mensaje_whatsapp(datos_cliente, resumen_pedido)
-    
-    # Crear el enlace
-    enlace = crear_enlace_whatsapp(telefono, mensaje)
-    
-    # Generar código QR
-    qr_path = generar_qr_whatsapp(telefono, mensaje) if QR_DISPONIBLE else None
-    
-    # Preguntar si desea abrir el navegador
-    print("\n¿Deseas abrir el enlace de WhatsApp en tu navegador? (s/n): ", end="")
-    respuesta = input().strip().lower()
-    
-    browser_opened = False
-    if respuesta == 's' or respuesta == 'si' or respuesta == 'y' or respuesta == 'yes':
-        browser_opened = abrir_chat_directo(telefono, mensaje)
-    
-    # Mostrar instrucciones
-    print("\n📱 INSTRUCCIONES PARA ENVIAR EL PEDIDO POR WHATSAPP:")
-    if qr_path:
-        print(f"1. OPCIÓN 1: Escanea el código QR generado ({qr_path})")
-    print(f"2. OPCIÓN 2: Abre este enlace manualmente:")
-    print(f"   {enlace}")
-    print("3. El chat de WhatsApp se abrirá con el mensaje listo para enviar")
-    print("4. Solo haz clic en el botón de ENVIAR en WhatsApp\n")
-    
-    return {
-        'enlace': enlace,
-        'qr_path': qr_path,
-        'browser_opened': browser_opened
-    }
-
-###############################
-# PARTE 2: FACTURAS EXCEL
-###############################
-
-class FacturaExcel:
-    def __init__(self):
-        """Inicializa el generador de facturas en Excel"""
-        self.wb = Workbook()
-        self.ws = self.wb.active
-        self.ws.title = "Factura"
-        
-        # Cargar contador de facturas
-        self.contador_file = "invoice_count.json"
-        self.num_factura = self._obtener_numero_factura()
-        
-        # Estilos predefinidos
-        self.titulo_font = Font(name='Arial', size=16, bold=True)
-        self.subtitulo_font = Font(name='Arial', size=12, bold=True)
-        self.header_font = Font(name='Arial', size=11, bold=True, color="FFFFFF")
-        self.normal_font = Font(name='Arial', size=11)
-        
-        # Colores
-        self.color_principal = "FF8C00"  # Naranja para mantener la identidad de hamburguesas
-        self.color_secundario = "FFC04D"  # Naranja claro
-        
-        # Bordes
-        self.thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        
-    def _obtener_numero_factura(self):
-        """
-        Obtiene y actualiza el número de factura secuencial
-        """
-        today = datetime.date.today().isoformat()
-        try:
-            with open(self.contador_file, "r") as f:
-                data = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            data = {"last_number": 0, "date": today}
-        
-        # Si es un nuevo día, reiniciar contador
-        if data.get("date") != today:
-            count = 1
-        else:
-            count = data.get("last_number", 0) + 1
-            
-        # Guardar nuevo contador
-        data["last_number"] = count
-        data["date"] = today
-        
-        with open(self.contador_file, "w") as f:
-            json.dump(data, f)
-            
-        # Formato: YYYYMMDD-NNN
-        fecha_formato = today.replace("-", "")
-        return f"{fecha_formato}-{count:03d}"
-        
-    def _configurar_pagina(self):
-        """Configura las dimensiones y márgenes de la página"""
-        # Ajustar anchos de columna
-        self.ws.column_dimensions['A'].width = 5   # Núm ítem
-        self.ws.column_dimensions['B'].width = 40  # Descripción
-        self.ws.column_dimensions['C'].width = 12  # Cantidad
-        self.ws.column_dimensions['D'].width = 15  # Precio unitario
-        self.ws.column_dimensions['E'].width = 15  # Total
-    
-    def _crear_encabezado(self):
-        """Crea el encabezado de la factura con logo y datos de la empresa"""
-        # Intentar insertar logo si existe
-        try:
-            if Image is not None and os.path.exists(LOGO_PATH):
-                logo = Image(LOGO_PATH)
-                logo.width = 150
-                logo.height = 70
-                self.ws.add_image(logo, "A1")
-        except Exception as e:
-            logger.warning(f"No se pudo cargar el logo: {e}")
-            self.ws['A1'] = EMPRESA
-            self.ws['A1'].font = Font(name='Arial', size=20, bold=True)
-        
-        # Información de la empresa - Lado izquierdo
-        self.ws['B1'] = EMPRESA
-        self.ws['B1'].font = self.titulo_font
-        
-        self.ws['B2'] = f"NIT: {NIT}"
-        self.ws['B2'].font = self.normal_font
-        
-        self.ws['B3'] = DIRECCION_EMPRESA
-        self.ws['B3'].font = self.normal_font
-        
-        self.ws['B4'] = f"Tel: {TELEFONO_EMPRESA}"
-        self.ws['B4'].font = self.normal_font
-        
-        self.ws['B5'] = f"Email: {CORREO_EMPRESA}"
-        self.ws['B5'].font = self.normal_font
-        
-        # Información de factura - Lado derecho
-        self.ws['D1'] = "FACTURA DE VENTA"
-        self.ws['D1'].font = self.titulo_font
-        self.ws['D1'].alignment = Alignment(horizontal='center')
-        self.ws.merge_cells('D1:E1')
-        
-        self.ws['D2'] = f"No. {self.num_factura}"
-        self.ws['D2'].font = self.subtitulo_font
-        self.ws['D2'].alignment = Alignment(horizontal='center')
-        self.ws.merge_cells('D2:E2')
-        
-        # Fecha de emisión
-        fecha_actual = datetime.datetime.now().strftime("%d/%m/%Y %H:%M")
-        self.ws['D3'] = "Fecha de Emisión:"
-        self.ws['D3'].font = self.normal_font
-        self.ws['D3'].alignment = Alignment(horizontal='right')
-        
-        self.ws['E3'] = fecha_actual
-        self.ws['E3'].font = self.normal_font
-        
-        # Separador
-        for col in range(1, 6):  # A-E
-            self.ws.cell(row=7, column=col).fill = PatternFill(
-                start_color=self.color_principal, 
-                end_color=self.color_principal,
-                fill_type="solid"
-            )
-    
-    def _agregar_datos_cliente(self, datos_cliente):
-        """
-        Agrega la sección de datos del cliente
-        
-        Args:
-            datos_cliente: Diccionario con nombre, direccion, telefono
-        """
-        row = 8
-        
-        self.ws[f'A{row}'] = "DATOS DEL CLIENTE"
-        self.ws[f'A{row}'].font = self.subtitulo_font
-        self.ws.merge_cells(f'A{row}:E{row}')
-        
-        row += 1
-        self.ws[f'A{row}'] = "Nombre:"
-        self.ws[f'A{row}'].font = self.header_font
-        self.ws[f'A{row}'].fill = PatternFill(start_color=self.color_principal, 
-                                              end_color=self.color_principal,
-                                              fill_type="solid")
-        
-        self.ws[f'B{row}'] = datos_cliente['nombre']
-        self.ws[f'B{row}'].font = self.normal_font
-        self.ws.merge_cells(f'B{row}:E{row}')
-        
-        row += 1
-        self.ws[f'A{row}'] = "Teléfono:"
-        self.ws[f'A{row}'].font = self.header_font
-        self.ws[f'A{row}'].fill = PatternFill(start_color=self.color_principal, 
-                                              end_color=self.color_principal,
-                                              fill_type="solid")
-        
-        self.ws[f'B{row}'] = datos_cliente['telefono']
-        self.ws[f'B{row}'].font = self.normal_font
-        self.ws.merge_cells(f'B{row}:E{row}')
-        
-        row += 1
-        self.ws[f'A{row}'] = "Dirección:"
-        self.ws[f'A{row}'].font = self.header_font
-        self.ws[f'A{row}'].fill = PatternFill(start_color=self.color_principal, 
-                                              end_color=self.color_principal,
-                                              fill_type="solid")
-        
-        self.ws[f'B{row}'] = datos_cliente['direccion']
-        self.ws[f'B{row}'].font = self.normal_font
-        self.ws.merge_cells(f'B{row}:E{row}')
-        
-        row += 1
-        self.ws[f'A{row}'] = "Pago:"
-        self.ws[f'A{row}'].font = self.header_font
-        self.ws[f'A{row}'].fill = PatternFill(start_color=self.color_principal, 
-                                              end_color=self.color_principal,
-                                              fill_type="solid")
-        
-        self.ws[f'B{row}'] = datos_cliente['metodo_pago']
-        self.ws[f'B{row}'].font = self.normal_font
-        self.ws.merge_cells(f'B{row}:E{row}')
-        
-        # Espacio
-        row += 2
-        return row
-    
-    def _crear_tabla_productos(self, row_start, items):
-        """
-        Crea la tabla de productos del pedido
-        
-        Args:
-            row_start: Fila donde inicia la tabla
-            items: Lista de diccionarios con los items del pedido
-                   [{'descripcion': '', 'cantidad': n, 'precio': n, 'total': n}, ...]
-                   
-        Returns:
-            int: Fila siguiente después de la tabla
-        """
-        # Encabezados de tabla
-        headers = ["#", "Descripción", "Cantidad", "Precio Unit.", "Total"]
-        
-        row = row_start
-        self.ws[f'A{row}'] = "DETALLE DEL PEDIDO"
-        self.ws[f'A{row}'].font = self.subtitulo_font
-        self.ws.merge_cells(f'A{row}:E{row}')
-        
-        # Cabecera de tabla
-        row += 1
-        for col_idx, header in enumerate(headers, 1):
-            col_letter = get_column_letter(col_idx)
-            self.ws[f'{col_letter}{row}'] = header
-            self.ws[f'{col_letter}{row}'].font = self.header_font
-            self.ws[f'{col_letter}{row}'].alignment = Alignment(horizontal='center')
-            self.ws[f'{col_letter}{row}'].fill = PatternFill(
-                start_color=self.color_principal, 
-                end_color=self.color_principal,
-                fill_type="solid"
-            )
-            # Borde
-            self.ws[f'{col_letter}{row}'].border = self.thin_border
-        
-        # Contenido de la tabla
-        total_general = 0
-        domicilio = 0
-        
-        for i, item in enumerate(items, 1):
-            row += 1
-            
-            # Número de ítem
-            self.ws[f'A{row}'] = i
-            self.ws[f'A{row}'].alignment = Alignment(horizontal='center')
-            
-            # Descripción
-            self.ws[f'B{row}'] = item['descripcion']
-            
-            # Cantidad
-            self.ws[f'C{row}'] = item['cantidad']
-            self.ws[f'C{row}'].alignment = Alignment(horizontal='center')
-            
-            # Precio unitario
-            self.ws[f'D{row}'] = item['precio']
-            self.ws[f'D{row}'].number_format = '"$"#,##0'
-            self.ws[f'D{row}'].alignment = Alignment(horizontal='right')
-            
-            # Total
-            total_item = item['cantidad'] * item['precio']
-            self.ws[f'E{row}'] = total_item
-            self.ws[f'E{row}'].number_format = '"$"#,##0'
-            self.ws[f'E{row}'].alignment = Alignment(horizontal='right')
-            
-            # Si es domicilio, guardarlo aparte
-            if 'domicilio' in item['descripcion'].lower():
-                domicilio = total_item
-            else:
-                total_general += total_item
-            
-            # Bordes para toda la fila
-            for col_idx in range(1, 6):
-                col_letter = get_column_letter(col_idx)
-                self.ws[f'{col_letter}{row}'].border = self.thin_border
-                
-        # Subtotal y domicilio
-        row += 2
-        self.ws[f'D{row}'] = "Subtotal:"
-        self.ws[f'D{row}'].font = self.header_font
-        self.ws[f'D{row}'].alignment = Alignment(horizontal='right')
-        
-        self.ws[f'E{row}'] = total_general
-        self.ws[f'E{row}'].number_format = '"$"#,##0'
-        self.ws[f'E{row}'].alignment = Alignment(horizontal='right')
-        self.ws[f'E{row}'].font = self.normal_font
-        
-        row += 1
-        self.ws[f'D{row}'] = "Domicilio:"
-        self.ws[f'D{row}'].font = self.header_font
-        self.ws[f'D{row}'].alignment = Alignment(horizontal='right')
-        
-        self.ws[f'E{row}'] = domicilio
-        self.ws[f'E{row}'].number_format = '"$"#,##0'
-        self.ws[f'E{row}'].alignment = Alignment(horizontal='right')
-        self.ws[f'E{row}'].font = self.normal_font
-        
-        row += 1
-        self.ws[f'D{row}'] = "TOTAL A PAGAR:"
-        self.ws[f'D{row}'].font = self.header_font
-        self.ws[f'D{row}'].alignment = Alignment(horizontal='right')
-        
-        self.ws[f'E{row}'] = total_general + domicilio
-        self.ws[f'E{row}'].number_format = '"$"#,##0'
-        self.ws[f'E{row}'].alignment = Alignment(horizontal='right')
-        self.ws[f'E{row}'].font = self.subtitulo_font
-        
-        # Agregar notas o términos
-        row += 3
-        self.ws[f'A{row}'] = "NOTAS:"
-        self.ws[f'A{row}'].font = self.subtitulo_font
-        self.ws.merge_cells(f'A{row}:E{row}')
-        
-        row += 1
-        self.ws[f'A{row}'] = "• Esta factura es un comprobante válido para reclamaciones y garantías."
-        self.ws[f'A{row}'].font = self.normal_font
-        self.ws.merge_cells(f'A{row}:E{row}')
-        
-        row += 1
-        self.ws[f'A{row}'] = "• Cualquier inconveniente con su pedido, contáctenos al " + TELEFONO_EMPRESA
-        self.ws[f'A{row}'].font = self.normal_font
-        self.ws.merge_cells(f'A{row}:E{row}')
-        
-        row += 2
-        self.ws[f'A{row}'] = "¡GRACIAS POR SU COMPRA!"
-        self.ws[f'A{row}'].font = self.subtitulo_font
-        self.ws[f'A{row}'].alignment = Alignment(horizontal='center')
-        self.ws.merge_cells(f'A{row}:E{row}')
-        
-        return row + 1
-        
-    def generar_factura(self, datos_cliente, resumen_pedido):
-        """
-        Genera una factura completa en Excel
-        
-        Args:
-            datos_cliente: Diccionario con datos del cliente
-            resumen_pedido: Texto con el resumen del pedido
-            
-        Returns:
-            str: Ruta al archivo Excel generado
-        """
-        # Extraer items del pedido desde el resumen de texto
-        items = self._extraer_items_del_resumen(resumen_pedido)
-        
-        # Configurar página
-        self._configurar_pagina()
-        
-        # Crear encabezado
-        self._crear_encabezado()
-        
-        # Agregar datos del cliente
-        row = self._agregar_datos_cliente(datos_cliente)
-        
-        # Agregar tabla de productos
-        self._crear_tabla_productos(row, items)
-        
-        # Guardar archivo
-        fecha = datetime.date.today().strftime("%Y%m%d")
-        nombre_archivo = f"Factura_{self.num_factura}_{datos_cliente['nombre'].replace(' ', '_')}.xlsx"
-        
-        ruta_archivo = os.path.join(os.getcwd(), nombre_archivo)
-        self.wb.save(ruta_archivo)
-        
-        logger.info(f"Factura generada: {ruta_archivo}")
-        return ruta_archivo
-        
-    def _extraer_items_del_resumen(self, resumen_pedido):
-        """
-        Extrae los items y precios del resumen textual del pedido
-        
-        Args:
-            resumen_pedido: Texto con el resumen del pedido
-            
-        Returns:
-            list: Lista de diccionarios con detalles de items
-        """
-        items = []
-        
-        # Dividir por líneas y buscar patrones de items y precios
-        lineas = resumen_pedido.strip().split('\n')
-        
-        for linea in lineas:
-            linea = linea.strip()
-            if not linea:
-                continue
-            
-            # Algunos patrones comunes:
-            # 1. "X Hamburguesa Clásica - $12000"
-            # 2. "Hamburguesa Clásica (x2) - $24000"
-            # 3. "Domicilio - $2000"
-            
-            # Patrón 1: "X Item - $Precio"
-            patron1 = r'(\d+)\s+(.+?)\s*-\s*\$?(\d+(?:,\d+)?)'
-            coincidencia = re.search(patron1, linea)
-            
-            if coincidencia:
-                cantidad = int(coincidencia.group(1))
-                descripcion = coincidencia.group(2).strip()
-                precio_total = float(coincidencia.group(3).replace(',', ''))
-                precio_unitario = precio_total / cantidad
-                
-                items.append({
-                    'descripcion': descripcion,
-                    'cantidad': cantidad,
-                    'precio': precio_unitario,
-                    'total': precio_total
-                })
-                continue
-            
-            # Patrón 2: "Item (xX) - $Precio"
-            patron2 = r'(.+?)\s*\(x(\d+)\)\s*-\s*\$?(\d+(?:,\d+)?)'
-            coincidencia = re.search(patron2, linea)
-            
-            if coincidencia:
-                descripcion = coincidencia.group(1).strip()
-                cantidad = int(coincidencia.group(2))
-                precio_total = float(coincidencia.group(3).replace(',', ''))
-                precio_unitario = precio_total / cantidad
-                
-                items.append({
-                    'descripcion': descripcion,
-                    'cantidad': cantidad,
-                    'precio': precio_unitario,
-                    'total': precio_total
-                })
-                continue
-            
-            # Patrón 3: "Item - $Precio" (cantidad 1 implícita)
-            patron3 = r'(.+?)\s*-\s*\$?(\d+(?:,\d+)?)'
-            coincidencia = re.search(patron3, linea)
-            
-            if coincidencia:
-                descripcion = coincidencia.group(1).strip()
-                precio = float(coincidencia.group(2).replace(',', ''))
-                
-                # Si contiene "domicilio" o términos similares
-                if any(term in descripcion.lower() for term in ["domicilio", "envío", "delivery"]):
-                    items.append({
-                        'descripcion': "Domicilio",
-                        'cantidad': 1,
-                        'precio': precio,
-                        'total': precio
-                    })
-                else:
-                    items.append({
-                        'descripcion': descripcion,
-                        'cantidad': 1,
-                        'precio': precio,
-                        'total': precio
-                    })
-                continue
-        
-        # Si no se identificaron items, crear uno genérico
-        if not items:
-            items.append({
-                'descripcion': "Pedido completo (ver detalle en resumen)",
-                'cantidad': 1,
-                'precio': 0,  # Precio desconocido
-                'total': 0
-            })
-        
-        return items
-
-def generar_y_enviar_factura(datos_cliente, resumen_pedido):
-    """
-    Genera una factura Excel y la envía por correo
-    
-    Args:
-        datos_cliente: Diccionario con datos del cliente
-        resumen_pedido: Texto del resumen del pedido
-        
-    Returns:
-        tuple: (éxito_generación, éxito_envío, ruta_factura)
-    """
-    try:
-        # Crear generador de facturas
-        factura_gen = FacturaExcel()
-        
-        # Generar factura
-        ruta_factura = factura_gen.generar_factura(datos_cliente, resumen_pedido)
-        
-        # Enviar por correo
-        enviado = enviar_factura_por_correo(ruta_factura, datos_cliente, resumen_pedido)
-        
-        return True, enviado, ruta_factura
-    
-    except Exception as e:
-        logger.error(f"Error al generar/enviar factura: {e}")
-        return False, False, None
-
-def enviar_factura_por_correo(ruta_factura, datos_cliente, resumen_pedido):
-    """
-    Envía la factura por correo electrónico
-    
-    Args:
-        ruta_factura: Ruta al archivo Excel de la factura
-        datos_cliente: Diccionario con datos del cliente
-        resumen_pedido: Texto con el resumen del pedido
-        
-    Returns:
-        bool: True si se envió correctamente
-    """
-    # Datos de correo electrónico
-    smtp_server = "smtp.gmail.com"
-    smtp_port = 587
-    smtp_user = "apeironiafilo@gmail.com"  # Usar el mismo del código original
-    smtp_password = "nuhk ijhw szaf rgut"  # Usar el mismo del código original
-    
-    # Destinatarios
-    to_email = "samirosorio21@gmail.com , josedanielorregor@gmail.com , haidyflorez98@gmail.com , ab4962267@gmail.com "  # Usar los mismos del código original
-    
-    try:
-        # Crear mensaje
-        mensaje = MIMEMultipart()
-        mensaje['From'] = f"Samir's Burgers <{smtp_user}>"
-        mensaje['To'] = to_email
-        mensaje['Subject'] = f"🧾 Factura - Samir's Burgers - Pedido {os.path.basename(ruta_factura).split('_')[1]}"
-        
-        # Cuerpo HTML del correo
-        html = f"""
-        <html>
-          <body style="font-family: Arial, sans-serif;">
-            <div style="max-width: 600px; margin: 0 auto; padding: 20px; border: 1px solid #ddd; border-radius: 5px;">
-              <div style="text-align: center; margin-bottom: 20px;">
-                <h1 style="color: #FF8C00;">🧾 Factura - Samir's Burgers</h1>
-              </div>
-              
-              <p>Estimado cliente,</p>
-              
-              <p>Adjunto encontrará la <strong>factura electrónica</strong> correspondiente a su pedido en Samir's Burgers.</p>
-              
-              <div style="background-color: #f9f9f9; padding: 15px; border-radius: 5px; margin: 15px 0;">
-                <h3 style="margin-top: 0; color: #FF8C00;">Resumen del Pedido:</h3>
-                <p style="white-space: pre-line;">{resumen_pedido}</p>
-              </div>
-              
-              <p>La factura adjunta es un documento válido para efectos fiscales y garantías de servicio.</p>
-              
-              <p>Si tiene alguna pregunta o inquietud, no dude en contactarnos al {TELEFONO_EMPRESA}.</p>
-              
-              <div style="margin-top: 30px; padding-top: 20px; border-top: 1px solid #ddd; text-align: center; color: #777;">
-                <p>¡Gracias por su preferencia!</p>
-                <p>Samir's Burgers - Sabor que enamora</p>
-                <p>{DIRECCION_EMPRESA}</p>
-              </div>
-            </div>
-          </body>
-        </html>
-        """
-        
-        # Adjuntar HTML
-        mensaje.attach(MIMEText(html, "html"))
-        
-        # Adjuntar factura
-        with open(ruta_factura, "rb") as archivo:
-            adjunto = MIMEBase("application", "octet-stream")
-            adjunto.set_payload(archivo.read())
-        
-        encoders.encode_base64(adjunto)
-        adjunto.add_header(
-            "Content-Disposition", 
-            f"attachment; filename={os.path.basename(ruta_factura)}"
-        )
-        mensaje.attach(adjunto)
-        
-        # Enviar correo
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            server.starttls()
-            server.login(smtp_user, smtp_password)
-            server.send_message(mensaje)
-            
-        logger.info(f"Factura enviada exitosamente por correo a {to_email}")
-        return True
-    
-    except Exception as e:
-        logger.error(f"Error al enviar factura por correo: {e}")
-        return False
-
-###############################
-# PARTE 3: FUNCIONES PRINCIPALES DEL CHATBOT
-###############################
-
-def actualizar_contador_pedidos():
-    """
-    Actualiza y retorna el número de pedido para el día actual.
-    Se almacena en un archivo 'order_count.json' que contiene un diccionario
-    con la fecha (YYYY-MM-DD) como clave y el contador como valor.
-    """
-    contador_file = "order_count.json"
-    today = datetime.date.today().isoformat()
-    try:
-        with open(contador_file, "r") as f:
-            data = json.load(f)
-    except FileNotFoundError:
-        data = {}
-    count = data.get(today, 0) + 1
-    data[today] = count
-    with open(contador_file, "w") as f:
-        json.dump(data, f)
-    return count
-
-def obtener_respuesta(conversacion):
-    """Envía la conversación a OpenAI y retorna la respuesta."""
-    try:
-        response = openai.ChatCompletion.create(
-            model="gpt-4o",  # Usa un modelo válido
-            messages=conversacion,
-            max_tokens=1000
-        )
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        print("Error al obtener respuesta de OpenAI:", e)
-        return "😕 Lo siento, ha ocurrido un error."
-
-def generar_resumen_pedido(conversacion, datos_cliente):
-    """
-    Genera un resumen completo del pedido combinando la conversación y los datos del cliente.
-    """
-    prompt = (
-        "A partir de la siguiente conversación, genera un resumen completo del pedido, "
-        "incluyendo todos los ítems, combos, promociones y detalles de domicilio. "
-        "Asegúrate de incluir las cantidades exactas y los precios de cada ítem. "
-        "El formato debe ser: X [nombre del producto] - $[precio]. "
-        "Luego, añade la siguiente información del cliente:\n\n"
-    )
-    prompt += (
-        f"Nombre: {datos_cliente['nombre']}\n"
-        f"Teléfono: {datos_cliente['telefono']}\n"
-        f"Dirección: {datos_cliente['direccion']}\n"
-        f"Método de pago: {datos_cliente['metodo_pago']}\n\n"
-    )
-    prompt += "Conversación:\n"
-    for msg in conversacion:
-        prompt += f"{msg['role']}: {msg['content']}\n"
-    prompt += "\nResumen del pedido:"
-    
-    try:
-        resumen_response = openai.ChatCompletion.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "Eres un asistente que resume pedidos de un restaurante de forma clara y detallada. Asegúrate de especificar las cantidades y los precios de cada ítem."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=500
-        )
-        resumen = resumen_response.choices[0].message.content.strip()
-        return resumen
-    except Exception as e:
-        print("Error al generar el resumen del pedido:", e)
-        return "❌ Error al generar el resumen del pedido."
-
-def formatear_pedido_en_bullets(pedido):
-    """
-    Toma la cadena 'pedido' y la convierte en una lista HTML con viñetas.
-    Se asume que cada ítem está separado por saltos de línea.
-    """
-    items = pedido.splitlines()
-    bullet_list = "<ul>"
-    for item in items:
-        if item.strip():
-            bullet_list += f"<li>{item.strip()}</li>"
-    bullet_list += "</ul>"
-    return bullet_list
-
-def enviar_pedido_por_correo(pedido, datos_cliente):
-    """
-    Envía el resumen del pedido por correo electrónico con formato HTML y un asunto
-    que incluye el número del pedido (contador diario).
-    Se organiza en secciones para el coordinador, domiciliario y contable.
-    """
-    # Actualizar el contador y obtener el número de pedido del día
-    count = actualizar_contador_pedidos()
-    
-    # Formatear el contenido del pedido en bullets
-    bullet_pedido = formatear_pedido_en_bullets(pedido)
-    
-    cuerpo = f"""
-    <html>
-      <body style="font-family: Arial, sans-serif;">
-        <hr>
-        <h2 style="text-align: center;">🍔 PEDIDO FINAL - Samir's Burgers 🍔</h2>
-        <h3 style="text-align: center;">Pedido #{count}</h3>
-        <hr>
-        <h3>👨‍🍳 Pedido:</h3>
-        {bullet_pedido}
-        <hr>
-        <h3>📞 Información del Cliente:</h3>
-        <ul>
-          <li><strong>Nombre:</strong> {datos_cliente['nombre']}</li>
-          <li><strong>Teléfono:</strong> {datos_cliente['telefono']}</li>
-          <li><strong>Dirección de entrega:</strong> {datos_cliente['direccion']}</li>
-          <li><strong>Método de pago:</strong> {datos_cliente['metodo_pago']}</li>
-        </ul>
-        <hr>
-        <h3>📝 Notas para el Coordinador:</h3>
-        <p>Verificar la exactitud del pedido y confirmar la preparación.</p>
-        <h3>🚗 Notas para el Domiciliario:</h3>
-        <p>Entregar el pedido a la dirección indicada y contactar al cliente al llegar.</p>
-        <h3>💰 Notas para el Contable:</h3>
-        <p>Registrar el total a pagar y facturar el pedido.</p>
-        <hr>
-        <p style="text-align: center;">¡Gracias por tu preferencia! 🎉</p>
-      </body>
-    </html>
-    """
-    msg = MIMEText(cuerpo, "html", "utf-8")
-    msg['Subject'] = f"🍔 Pedido Final - Samir's Burgers - Pedido #{count} 🍔"
-    msg['From'] = "apeironiafilo@gmail.com"       # Tu correo de envío
-    msg['To'] = "jmct_74@gmail.com, danielalvarezmoncada527@gmail.com"             # Correo de destino
-     # Correo de destino
-
-    smtp_server = "smtp.gmail.com"
-    smtp_port = 587  # TLS
-    smtp_user = "apeironiafilo@gmail.com"
-    smtp_password = "nuhk ijhw szaf rgut"  # Contraseña de aplicación
-
-    try:
-        print("[DEBUG] Conectando al servidor SMTP...")
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            server.starttls()
-            print("[DEBUG] Iniciando sesión en SMTP...")
-            server.login(smtp_user, smtp_password)
-            print("[DEBUG] Enviando correo...")
-            server.send_message(msg)
-        print("✅ Pedido enviado exitosamente por correo.")
-        return True
-    except Exception as e:
-        print("❌ Error al enviar el correo:", e)
-        return False
-
-def procesar_opciones_envio(datos_cliente, resumen_pedido):
-    """
-    Procesa las opciones de envío del pedido: correo HTML, factura Excel y WhatsApp
-    
-    Args:
-        datos_cliente: Diccionario con los datos del cliente
-        resumen_pedido: Texto con el resumen del pedido
-    """
-    opciones_validas = ['1', '2', '3', '4', '5', '6', '7']
-    opciones_seleccionadas = []
-    
-    while True:
-        print("\n📱 OPCIONES DE ENVÍO DEL PEDIDO:")
-        print("1. Enviar resumen por correo (formato HTML)")
-        print("2. Enviar factura Excel por correo")
-        print("3. Enviar confirmación por WhatsApp (mensaje)")
-        print("4. Enviar confirmación por WhatsApp (enlace directo/QR)")
-        print("5. Enviar todas las opciones de correo (1 y 2)")
-        print("6. Enviar TODAS las opciones anteriores (completo)")
-        print("7. Finalizar sin enviar")
-        
-        seleccion = input("\nSelecciona una opción (1-7): ").strip()
-        
-        if seleccion not in opciones_validas:
-            print("❌ Opción no válida. Intenta nuevamente.")
-            continue
-        
-        # Salir del bucle si la opción es válida
-        opciones_seleccionadas.append(seleccion)
-        break
-    
-    resultados = {
-        'email_html': False,
-        'email_excel': False,
-        'whatsapp': False,
-        'whatsapp_direct': False,
-        'whatsapp_file': False
-    }
-    
-    # Variables para factura
-    ruta_factura = None
-    exito_gen_factura = False
-    
-    # Procesar opciones seleccionadas
-    if '6' in opciones_seleccionadas:  # TODAS las opciones
-        print("\n🚀 Procesando TODOS los métodos de envío...")
-        
-        # 1. Enviar resumen por correo (HTML)
-        print("\n📧 Enviando resumen por correo (HTML)...")
-        resultados['email_html'] = enviar_pedido_por_correo(resumen_pedido, datos_cliente)
-        
-        # 2. Generar factura Excel (la necesitamos para WhatsApp también)
-        print("\n📊 Generando factura Excel...")
-        exito_gen_factura, exito_envio, ruta_factura = generar_y_enviar_factura(datos_cliente, resumen_pedido)
-        resultados['email_excel'] = exito_envio
-        
-        # 3. Enviar mensaje por WhatsApp (Selenium)
-        print("\n📱 Enviando mensaje por WhatsApp (Selenium)...")
-        resultados['whatsapp'] = enviar_pedido_por_whatsapp(datos_cliente['telefono'], resumen_pedido, datos_cliente)
-        
-        # 3b. Enviar factura por WhatsApp si se generó correctamente
-        if exito_gen_factura and ruta_factura:
-            print("\n📎 Enviando factura Excel por WhatsApp...")
-            resultados['whatsapp_file'] = enviar_factura_por_whatsapp(
-                datos_cliente['telefono'], 
-                ruta_factura, 
-                datos_cliente, 
-                resumen_pedido
-            )
-        
-        # 4. Generar enlace y QR para WhatsApp directo
-        print("\n🔗 Generando enlace y QR para WhatsApp directo...")
-        try:
-            if QR_DISPONIBLE:
-                resultado_direct = enviar_pedido_whatsapp_directo(
-                    datos_cliente['telefono'], 
-                    resumen_pedido, 
-                    datos_cliente
-                )
-                resultados['whatsapp_direct'] = True
-            else:
-                print("Para generar QR, instala: pip install qrcode[pil]")
-                enlace = crear_enlace_whatsapp(datos_cliente['telefono'], mensaje_whatsapp(datos_cliente, resumen_pedido))
-                print(f"Enlace directo: {enlace}")
-                resultados['whatsapp_direct'] = False
-        except Exception as e:
-            print(f"❌ Error al generar enlace de WhatsApp: {e}")
-            resultados['whatsapp_direct'] = False
-        
-    elif '5' in opciones_seleccionadas:  # Opciones de correo
-        print("\n🚀 Procesando métodos de envío por correo...")
-        
-        # 1. Enviar resumen por correo (HTML)
-        print("\n📧 Enviando resumen por correo (HTML)...")
-        resultados['email_html'] = enviar_pedido_por_correo(resumen_pedido, datos_cliente)
-        
-        # 2. Generar y enviar factura Excel
-        print("\n📊 Generando y enviando factura Excel...")
-        exito_gen_factura, exito_envio, ruta_factura = generar_y_enviar_factura(datos_cliente, resumen_pedido)
-        resultados['email_excel'] = exito_envio
-        
-    else:
-        # Procesar opciones individuales
-        if '1' in opciones_seleccionadas:
-            print("\n📧 Enviando resumen por correo (HTML)...")
-            resultados['email_html'] = enviar_pedido_por_correo(resumen_pedido, datos_cliente)
-            
-        if '2' in opciones_seleccionadas:
-            print("\n📊 Generando y enviando factura Excel...")
-            exito_gen_factura, exito_envio, ruta_factura = generar_y_enviar_factura(datos_cliente, resumen_pedido)
-            resultados['email_excel'] = exito_envio
-            
-        if '3' in opciones_seleccionadas:
-            print("\n📱 Enviando mensaje por WhatsApp (Selenium)...")
-            resultados['whatsapp'] = enviar_pedido_por_whatsapp(datos_cliente['telefono'], resumen_pedido, datos_cliente)
-            
-            # Si ya hemos generado la factura, preguntar si quiere enviarla por WhatsApp también
-            if exito_gen_factura and ruta_factura:
-                enviar_factura = input("\n¿Deseas enviar también la factura Excel por WhatsApp? (s/n): ").strip().lower()
-                if enviar_factura.startswith('s'):
-                    print("\n📎 Enviando factura Excel por WhatsApp...")
-                    resultados['whatsapp_file'] = enviar_factura_por_whatsapp(
-                        datos_cliente['telefono'], 
-                        ruta_factura, 
-                        datos_cliente, 
-                        resumen_pedido
-                    )
-            
-        if '4' in opciones_seleccionadas:
-            print("\n📱 Generando enlace y QR para WhatsApp...")
-            try:
-                # Verificar si la biblioteca qrcode está disponible
-                resultado_direct = enviar_pedido_whatsapp_directo(
-                    datos_cliente['telefono'], 
-                    resumen_pedido, 
-                    datos_cliente
-                )
-                resultados['whatsapp_direct'] = True
-            except NameError:
-                print("❌ Error: Se requiere instalar la biblioteca 'qrcode'. Ejecuta: pip install qrcode[pil]")
-                resultados['whatsapp_direct'] = False
-            except Exception as e:
-                print(f"❌ Error al generar enlace de WhatsApp: {e}")
-                resultados['whatsapp_direct'] = False
-    
-    # Mostrar resumen de resultados
-    print("\n📋 RESUMEN DE ENVÍOS:")
-    if resultados['email_html']:
-        print("✅ Resumen HTML enviado correctamente por correo")
-    else:
-        print("❌ No se envió el resumen HTML por correo")
-        
-    if resultados['email_excel']:
-        print("✅ Factura Excel enviada correctamente por correo")
-    else:
-        print("❌ No se envió la factura Excel por correo")
-        
-    if resultados['whatsapp']:
-        print("✅ Mensaje enviado correctamente por WhatsApp (Selenium)")
-    else:
-        if '3' in opciones_seleccionadas or '6' in opciones_seleccionadas:
-            print("❌ No se pudo enviar mensaje por WhatsApp usando Selenium")
-    
-    if resultados['whatsapp_file']:
-        print("✅ Factura Excel enviada correctamente por WhatsApp")
-    else:
-        if resultados['whatsapp'] and (exito_gen_factura and ruta_factura):
-            print("❌ No se pudo enviar la factura por WhatsApp")
-        
-    if resultados['whatsapp_direct']:
-        print("✅ Enlace y código QR para WhatsApp generados correctamente")
-    
-    return any(resultados.values())
-
-def test_whatsapp_direct():
-    """Función de prueba para enviar WhatsApp directamente a un número específico"""
-    numero = "3042535003"  # Tu número
-    print(f"\n=== PRUEBA DE WHATSAPP PARA NÚMERO {numero} ===\n")
-    
-    mensaje = (
-        f"🍔 *PRUEBA DE SAMIR'S BURGERS* 🍔\n\n"
-        f"Este es un mensaje de prueba enviado desde el sistema de Samir's Burgers.\n\n"
-        f"Si estás recibiendo esto, ¡la configuración está funcionando correctamente!\n\n"
-        f"Hora del envío: {datetime.datetime.now().strftime('%H:%M:%S')}"
-    )
-    
-    print("Generando enlace directo y QR para WhatsApp...")
-    
-    try:
-        if QR_DISPONIBLE:
-            resultado = enviar_pedido_whatsapp_directo(numero, mensaje, {"nombre": "Cliente de prueba", "direccion": "Dirección de prueba", "metodo_pago": "Efectivo"})
-            return resultado['browser_opened']
-        else:
-            print("Para generar QR, instala: pip install qrcode[pil]")
-            enlace = crear_enlace_whatsapp(numero, mensaje)
-            print(f"Enlace directo: {enlace}")
-            return abrir_chat_directo(numero, mensaje)
-    except Exception as e:
-        print(f"Error en prueba de WhatsApp: {e}")
-        return False
-
-def main():
-    """
-    Flujo del chatbot:
-      1. El usuario conversa con el asistente y realiza su pedido.
-      2. Al escribir "confirmar", se finaliza el pedido.
-      3. Se solicitan de forma individual los datos de contacto del cliente.
-      4. Se genera y muestra el resumen final del pedido.
-      5. Se presentan opciones de envío: correo HTML, factura Excel y WhatsApp.
-    """
-    conversacion = [
-        {
-            "role": "system",
-            "content": (
-                "Eres un asistente de Samir's Burgers en Medellín. "
-                "Nuestro menú incluye: Hamburguesa Clásica (6000), Hamburguesa Doble (8000), Papas Fritas (3000). "
-                "El domicilio cuesta 2000, pero es gratis en pedidos mayores a 15000. "
-                "No solicites aún la dirección, nombre, teléfono y método de pago; se agregarán al finalizar el pedido, "
-                "cuando el usuario escriba 'confirmar'. Luego, se mostrará el resumen final y las opciones de envío."
-            )
-        },
-        {
-            "role": "user",
-            "content": "¿Qué precios, combos y promociones tienes?"
-        }
-    ]
-    
-    print("\n" + "="*60)
-    print("🍔 Bienvenido a 'Samir's Burgers' 🍔")
-    print("="*60 + "\n")
-    print("¿En qué puedo ayudarte hoy?")
-    print("¿Qué precios, combos y promociones tienes?")
-    print("¿Qué deseas ordenar hoy?\n")
-    
-    # Bucle de conversación de pedido
-    while True:
-        user_input = input("Usuario: ")
-        user_input_norm = user_input.strip().lower()
-        
-        if user_input_norm == "confirmar":
-            print("\n✅ Has finalizado tu pedido correctamente.")
-            break
-        
-        if user_input_norm == "salir" or user_input_norm == "exit":
-            print("\n👋 Gracias por visitarnos. ¡Hasta pronto!")
-            sys.exit()
-        
-        if user_input_norm == "enviar":
-            print("⚠️ No se puede enviar aún. Primero debes confirmar tu pedido escribiendo 'confirmar'.")
-            continue
-        
-        conversacion.append({"role": "user", "content": user_input})
-        respuesta = obtener_respuesta(conversacion)
-        conversacion.append({"role": "assistant", "content": respuesta})
-        print(f"Asistente: {respuesta}\n")
-    
-    # Solicitar datos de contacto de forma individual
-    print("\n📋 Para completar tu pedido, por favor responde lo siguiente:")
-    direccion = input("¿Cuál es la dirección de entrega? ")
-    nombre_cliente = input("¿Cuál es tu nombre? ")
-    telefono = input("¿Cuál es tu número de teléfono? ")
-    
-    # Opciones de método de pago
-    print("\n💰 Selecciona tu método de pago:")
-    print("1. Efectivo")
-    print("2. Transferencia/Nequi")
-    print("3. Tarjeta de crédito/débito (al recibir)")
-    
-    metodo_pago = ""
-    while not metodo_pago:
-        opcion = input("Ingresa el número de tu método de pago (1-3): ").strip()
-        if opcion == "1":
-            metodo_pago = "Efectivo"
-        elif opcion == "2":
-            metodo_pago = "Transferencia/Nequi"
-        elif opcion == "3":
-            metodo_pago = "Tarjeta (al recibir)"
-        else:
-            print("❌ Opción no válida. Intenta nuevamente.")
-    
-    # Datos del cliente
-    datos_cliente = {
-        "direccion": direccion,
-        "nombre": nombre_cliente,
-        "telefono": telefono,
-        "metodo_pago": metodo_pago
-    }
-    
-    # Generar resumen del pedido
-    print("\n⏳ Generando resumen del pedido...")
-    resumen_pedido = generar_resumen_pedido(conversacion, datos_cliente)
-    
-    # Mostrar resumen final
-    print("\n" + "="*60)
-    print("📝 RESUMEN DE TU PEDIDO:")
-    print("="*60)
-    print(resumen_pedido)
-    print("="*60)
-    
-    # Procesar opciones de envío
-    procesar_opciones_envio(datos_cliente, resumen_pedido)
-    
-    print("\n🎉 ¡Pedido completado con éxito! 🎉")
-    print("Gracias por ordenar en Samir's Burgers. ¡Buen provecho!")
-
-def test_mode():
-    """Modo de prueba para probar componentes individuales"""
-    print("\n" + "="*60)
-    print("🧪 MODO DE PRUEBA - Samir's Burgers 🧪")
-    print("="*60 + "\n")
-    
-    print("Selecciona una opción de prueba:")
-    print("1. Probar envío de mensaje WhatsApp (Selenium)")
-    print("2. Probar WhatsApp directo (enlace/QR)")
-    print("3. Probar generación de factura Excel")
-    print("4. Probar envío de correo")
-    print("5. Salir")
-    
-    opcion = input("\nIngresa el número de opción: ").strip()
-    
-    if opcion == "1":
-        # Probar WhatsApp con Selenium
-        numero = input("Ingresa un número de teléfono para la prueba: ")
-        mensaje = "🍔 Este es un mensaje de prueba desde Samir's Burgers"
-        print(f"Enviando mensaje de prueba a {numero}...")
-        
-        bot = WhatsAppBot()
-        if bot.start():
-            result = bot.send_message(numero, mensaje)
-            bot.close()
-            
-            if result:
-                print("✅ Mensaje enviado correctamente")
-            else:
-                print("❌ No se pudo enviar el mensaje")
-        else:
-            print("❌ No se pudo iniciar WhatsApp Web")
-            
-    elif opcion == "2":
-        # Probar WhatsApp directo
-        test_whatsapp_direct()
-        
-    elif opcion == "3":
-        # Probar generación de factura
-        datos_prueba = {
-            "nombre": "Cliente de Prueba",
-            "telefono": "3001234567",
-            "direccion": "Calle de Prueba #123",
-            "metodo_pago": "Efectivo"
-        }
-        
-        resumen_prueba = (
-            "1 Hamburguesa Clásica - $6000\n"
-            "1 Papas Fritas - $3000\n"
-            "1 Gaseosa - $2000\n"
-            "Domicilio - $2000"
-        )
-        
-        factura_gen = FacturaExcel()
-        ruta = factura_gen.generar_factura(datos_prueba, resumen_prueba)
-        
-        print(f"✅ Factura generada correctamente: {ruta}")
-        
-    elif opcion == "4":
-        # Probar envío de correo
-        datos_prueba = {
-            "nombre": "Cliente de Prueba",
-            "telefono": "3001234567",
-            "direccion": "Calle de Prueba #123",
-            "metodo_pago": "Efectivo"
-        }
-        
-        resumen_prueba = (
-            "1 Hamburguesa Clásica - $6000\n"
-            "1 Papas Fritas - $3000\n"
-            "1 Gaseosa - $2000\n"
-            "Domicilio - $2000"
-        )
-        
-        resultado = enviar_pedido_por_correo(resumen_prueba, datos_prueba)
-        
-        if resultado:
-            print("✅ Correo enviado correctamente")
-        else:
-            print("❌ No se pudo enviar el correo")
-            
-    elif opcion == "5":
-        print("Saliendo del modo de prueba...")
-        return
-    
-    else:
-        print("❌ Opción no válida")
-    
-    # Preguntar si desea realizar otra prueba
-    otra_prueba = input("\n¿Deseas realizar otra prueba? (s/n): ").strip().lower()
-    if otra_prueba.startswith('s'):
-        test_mode()
-
-if __name__ == "__main__":
-    if len(sys.argv) > 1 and sys.argv[1] == "--test":
-        test_mode()
-    else:
+"""
+SAMIR IA.py: Script completo para el chatbot de Samir's Burgers
+Incluye las funcionalidades de WhatsApp (Selenium y enlace directo), generación de facturas Excel
+Todo integrado en un solo archivo - Optimizado para WhatsApp Web 2025
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import functools
+import queue
+import threading
+from contextlib import contextmanager
+import asyncio
+import datetime
+import re
+import logging
+import importlib.util
+import openai
+from dotenv import load_dotenv
+
+# Las bibliotecas pesadas (Selenium, openpyxl, smtplib/email) se importan de
+# forma diferida en el punto donde se usan: quien solo genera una factura no
+# paga el arranque de Selenium, y quien solo envía WhatsApp no paga openpyxl.
+
+# Motor alternativo para escribir las facturas. xlsxwriter escribe el XML
+# directamente y evita el coste de deduplicación de estilos de openpyxl
+# (~25% más rápido de extremo a extremo); se activa con EXCEL_BACKEND=xlsxwriter
+EXCEL_BACKEND = os.getenv("EXCEL_BACKEND", "openpyxl")
+XLSXWRITER_DISPONIBLE = importlib.util.find_spec("xlsxwriter") is not None
+
+# Para QR Code (el import real se hace al generar el primer QR)
+QR_DISPONIBLE = importlib.util.find_spec("qrcode") is not None
+if not QR_DISPONIBLE:
+    print("AVISO: Para generar códigos QR, instala: pip install qrcode[pil]")
+
+# Configuración de logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Capturas de pantalla de depuración: activadas con logging en DEBUG o con
+# la variable de entorno DEBUG_SCREENSHOTS=1
+DEBUG_SCREENSHOTS = bool(os.getenv("DEBUG_SCREENSHOTS"))
+
+# Cargar variables de entorno (incluye API Key de OpenAI)
+load_dotenv()
+openai.api_key = os.getenv('OPENAI_API_KEY')
+
+# Constantes para la factura
+EMPRESA = "Samir's Burgers"
+NIT = "901.234.567-8"
+DIRECCION_EMPRESA = "Calle 123 #45-67, Medellín"
+TELEFONO_EMPRESA = "+57 300 123 4567"
+CORREO_EMPRESA = "samirs.burgers@gmail.com"
+LOGO_PATH = "logo.png"  # Ruta al logo de la empresa (opcional)
+
+# Directorio de trabajo capturado una sola vez al importar: evita un
+# syscall getcwd() por cada factura/sesión (el script nunca cambia de cwd)
+_CWD = os.getcwd()
+
+# Limpieza de números de teléfono: la sustitución regex corre en C, a
+# diferencia de filter(str.isdigit, ...) que llama a Python por cada carácter
+_NON_DIGIT = re.compile(r"\D")
+# Forma que debería tener un número ya limpio: prefijo + opcional y 7-15
+# dígitos (longitudes E.164). Solo se usa como verificación de cordura
+_PHONE_RE = re.compile(r"^\+?\d{7,15}$")
+
+
+@functools.lru_cache(maxsize=256)
+def _normalize_phone(tel):
+    """
+    Normaliza un número de teléfono al formato que espera WhatsApp
+
+    Quita todo lo que no sea dígito y antepone el código de país de
+    Colombia (57) cuando falta. Único punto de normalización del módulo,
+    en lugar de la copia de filter(str.isdigit, ...) que tenía cada función.
+
+    Args:
+        tel: Número en cualquier formato (+57 300-123..., espacios, etc.)
+
+    Returns:
+        str: Solo dígitos, con el prefijo 57 garantizado
+    """
+    tel = tel.strip()
+    if not _PHONE_RE.match(tel.replace(" ", "").replace("-", "")):
+        logger.warning("Número de teléfono con formato inesperado: %r", tel)
+    digitos = _NON_DIGIT.sub("", tel)
+    if not digitos.startswith("57"):
+        digitos = "57" + digitos
+    return digitos
+
+# Patrón de líneas de item en el resumen del pedido, compilado una sola vez
+# al importar el módulo. Las tres formas reconocidas van en una única
+# alternancia con grupos con nombre, de modo que cada línea se recorre una
+# sola vez en lugar de una pasada por patrón (el orden de las alternativas
+# conserva la prioridad que tenían las búsquedas secuenciales):
+#   p1: "2 Hamburguesa Clásica - $24000"
+#   p2: "Hamburguesa Clásica (x2) - $24000"
+#   p3: "Domicilio - $2000" (cantidad 1 implícita)
+# Las descripciones usan clases negadas en lugar de .+? para que el motor
+# no genere estados de backtracking sobre caracteres que una descripción
+# nunca contiene ($, saltos de línea, o '(' antes del sufijo (xN))
+# Detección del cargo de domicilio: una sola pasada del motor de regex en
+# lugar de tres búsquedas de subcadena más un lower() por item
+_DELIVERY_RE = re.compile(r'domicilio|envío|delivery', re.IGNORECASE)
+
+# Claves de los diccionarios de ítem que consume la factura. El parser
+# acumula tuplas (más compactas y baratas de crear) y arma los
+# diccionarios de una vez al final con zip
+_ITEM_KEYS = ('descripcion', 'cantidad', 'precio', 'total', 'is_delivery')
+
+# Tabla de borrado para el prefiltro de líneas de ítem: elimina todo salvo
+# dígitos, '$' y '-', de modo que un único translate en C deja solo los
+# caracteres "de dinero" de la línea
+_MONEY_BITMAP = str.maketrans('', '', ''.join(
+    chr(c) for c in range(256) if chr(c) not in '0123456789$-'))
+
+_PATRON_ITEM = re.compile(
+    r'(?P<p1_qty>\d+)\s+(?P<p1_desc>[^$\n]+?)\s*-\s*\$?(?P<p1_price>\d+(?:,\d+)?)'
+    r'|(?P<p2_desc>[^(\n]+?)\s*\(x(?P<p2_qty>\d+)\)\s*-\s*\$?(?P<p2_price>\d+(?:,\d+)?)'
+    r'|(?P<p3_desc>[^$\n]+?)\s*-\s*\$?(?P<p3_price>\d+(?:,\d+)?)'
+)
+
+###############################
+# PARTE 1: INTEGRACIÓN CON WHATSAPP
+###############################
+
+def _import_selenium():
+    """Importa Selenium de forma diferida, la primera vez que se usa el navegador"""
+    global webdriver, Options, By, WebDriverWait, EC, Keys
+    global TimeoutException, NoSuchElementException, WebDriverException
+
+    if "webdriver" in globals():
+        return
+
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.common.keys import Keys  # Para usar teclas en send_message
+    from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
+
+
+# Driver de Chrome compartido a nivel de módulo: arrancar Chrome y cargar
+# WhatsApp Web cuesta varios segundos, así que se reutiliza la misma sesión
+# entre instancias de WhatsAppBot (envíos por lotes pagan el arranque una sola vez)
+_driver_singleton = None
+
+# WebDriver no es seguro entre hilos: todo envío que pase por el Chrome
+# compartido debe entrar de uno en uno bajo este lock
+_selenium_send_lock = threading.Lock()
+
+
+def _ampliar_pool_http():
+    """
+    Sube el maxsize del pool de conexiones urllib3 del cliente de Selenium
+
+    El valor por defecto es 1, lo que serializa a nivel HTTP los comandos
+    WebDriver concurrentes (sondeos de find_elements, envíos desde varios
+    hilos) y provoca avisos de "connection pool is full". Con chromedriver
+    local no se puede pasar un ClientConfig, así que se envuelve
+    _get_connection_manager para ampliar el pool a 16 conexiones.
+    """
+    try:
+        from selenium.webdriver.remote.remote_connection import RemoteConnection
+    except ImportError:
+        return
+
+    if getattr(RemoteConnection, "_pool_ampliado", False):
+        return
+
+    original = RemoteConnection._get_connection_manager
+
+    def _con_pool_grande(self):
+        manager = original(self)
+        try:
+            manager.connection_pool_kw["maxsize"] = 16
+        except AttributeError:
+            pass
+        return manager
+
+    RemoteConnection._get_connection_manager = _con_pool_grande
+    RemoteConnection._pool_ampliado = True
+
+
+def _get_or_create_driver(data_dir, headless=False):
+    """
+    Devuelve el driver de Chrome compartido si su sesión sigue viva,
+    o crea uno nuevo en caso contrario
+
+    Args:
+        data_dir: Directorio del perfil de Chrome para la sesión de WhatsApp
+        headless: Si es True, arranca Chrome sin interfaz (modo por lotes)
+    """
+    global _driver_singleton
+
+    _import_selenium()
+    _ampliar_pool_http()
+
+    if _driver_singleton is not None:
+        try:
+            _driver_singleton.current_url  # Lanza excepción si la sesión murió
+            return _driver_singleton
+        except Exception:
+            _driver_singleton = None
+
+    chrome_options = Options()
+    chrome_options.add_argument(f"user-data-dir={data_dir}")
+
+    # Opciones adicionales para mejorar la estabilidad
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--disable-notifications")
+
+    # WhatsApp Web carga fotos de perfil y miniaturas que el bot nunca mira:
+    # deshabilitar las imágenes y devolver el control en DOMContentLoaded
+    # (page_load_strategy 'eager') recorta el tiempo de carga de cada chat
+    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    chrome_options.add_experimental_option("prefs", {
+        "profile.default_content_setting_values.images": 2,
+        "profile.managed_default_content_settings.images": 2,
+    })
+    chrome_options.page_load_strategy = 'eager'
+
+    if headless:
+        chrome_options.add_argument("--headless=new")
+
+    try:
+        # Sintaxis actualizada para Selenium moderno
+        _driver_singleton = webdriver.Chrome(
+            options=chrome_options
+        )
+        _driver_singleton.maximize_window()
+    except Exception as e:
+        logger.error("Error al inicializar Chrome: %s", e)
+        raise
+
+    return _driver_singleton
+
+
+class WhatsAppBot:
+    # Selectores de WhatsApp Web compartidos por todas las instancias: se
+    # definen una sola vez (tuplas inmutables) y las uniones CSS se
+    # precalculan aquí para que cada llamada no pague joins ni listas nuevas
+    _LOADED_SELECTORS = (
+        "[data-testid='chat-list']",
+        "[data-testid='default-user']",
+        "[data-testid='search-tab']",
+        "[data-testid='menu-bar-menu']",
+        ".two",
+        "._3sh5K",
+        "#side",
+        "#pane-side",
+    )
+    _LOADED_CSS = ", ".join(_LOADED_SELECTORS)
+
+    _CONV_PANEL_SELECTORS = (
+        "[data-testid='conversation-panel-wrapper']",
+        "[data-testid='msg-container']",
+        ".copyable-area",
+        "#main",
+        "[role='application']",
+    )
+    _CONV_PANEL_CSS = ", ".join(_CONV_PANEL_SELECTORS)
+
+    _SEARCH_SELECTORS = (
+        "[data-testid='chat-list-search']",
+        "[data-testid='search-bar']",
+        "[title='Cuadro de texto de búsqueda']",
+        "._3SZ1t",
+    )
+
+    _INPUT_SELECTORS = (
+        "[data-testid='conversation-compose-box-input']",
+        "div[contenteditable='true'][data-tab='10']",
+        "div[contenteditable='true'][role='textbox']",
+        "div[role='textbox']",
+        "div.selectable-text[contenteditable='true']",
+        "#main div[contenteditable='true']",
+    )
+    _INPUT_CSS = ", ".join(_INPUT_SELECTORS)
+
+    _SEND_SELECTORS = (
+        "[data-testid='compose-btn-send']",
+        "[data-icon='send']",
+        "[data-testid='send']",
+        "[aria-label='Enviar']",
+        "button[aria-label='Enviar']",
+        "span[data-icon='send']",
+    )
+    _SEND_CSS = ", ".join(_SEND_SELECTORS)
+
+    _FILE_SEND_SELECTORS = (
+        "[data-testid='send']",
+        "[data-testid='btn-send']",
+        "[aria-label='Enviar']",
+        "[data-icon='send']",
+        "span[data-icon='send']",
+    )
+    _FILE_SEND_CSS = ", ".join(_FILE_SEND_SELECTORS)
+
+    _ATTACH_SELECTORS = (
+        "[data-testid='attach-clip']",
+        "[data-testid='compose-btn-attach']",
+        "[data-icon='attach-menu-plus']",
+        "[data-icon='attach']",
+        "[data-icon='clip']",
+        "[aria-label='Adjuntar']",
+        "[title='Adjuntar']",
+    )
+    _ATTACH_CSS = ", ".join(_ATTACH_SELECTORS)
+
+    _DOC_OPTION_SELECTORS = (
+        "[data-testid='mi-attach-document']",
+        "[data-testid='attach-document']",
+        "[data-icon='document']",
+        "[aria-label='Documento']",
+    )
+    _DOC_OPTION_CSS = ", ".join(_DOC_OPTION_SELECTORS)
+
+    _IMAGE_OPTION_SELECTORS = (
+        "[data-testid='mi-attach-gallery']",
+        "[data-testid='attach-image']",
+        "[data-icon='image']",
+        "[aria-label='Foto o video']",
+    )
+
+    _CAPTION_SELECTORS = (
+        "[data-testid='media-caption-input']",
+        "[data-testid='media-caption-input-container']",
+        "[data-testid='caption-input']",
+        "div[role='textbox'][data-tab='9']",
+        "[placeholder='Añade un comentario']",
+    )
+    _CAPTION_CSS = ", ".join(_CAPTION_SELECTORS)
+
+    # Textos de error comunes que WhatsApp muestra cuando un número es inválido
+    _ERROR_TEXTS = (
+        "El número de teléfono compartido a través del enlace",
+        "El número de teléfono no existe",
+        "número no está disponible",
+        "invalid",
+        "no se encuentra",
+    )
+
+    # XPath único que cubre todos los textos de error en una sola evaluación
+    _ERROR_XPATH = "//*[" + " or ".join(
+        f"contains(text(), {texto!r})" for texto in _ERROR_TEXTS
+    ) + "]"
+
+    def __init__(self, data_dir=None, headless=False):
+        """
+        Inicializa el bot de WhatsApp Web con Selenium
+
+        Args:
+            data_dir: Directorio para guardar la sesión de Chrome (para no escanear QR cada vez)
+            headless: Si es True, arranca Chrome sin interfaz (útil en modo por lotes)
+        """
+        self.driver = None
+        self.data_dir = data_dir or os.path.join(_CWD, "whatsapp_session")
+        self.headless = headless
+
+        # Último chat abierto con éxito: evita repetir la navegación completa
+        # cuando se envían varios mensajes seguidos al mismo número
+        self._current_chat = None
+
+        # Selector ganador por acción ('attach', 'caption', ...): WhatsApp Web
+        # mantiene el mismo DOM entre mensajes, así que tras el primer acierto
+        # los envíos siguientes van directo sin recorrer la lista de fallback
+        self._selector_cache = {}
+
+        # Flujo de adjuntos de esta versión de WhatsApp Web ('menu' abre un
+        # submenú intermedio; 'direct' va directo al selector de archivos).
+        # start() lo detecta tras el login; 'menu' es el valor conservador
+        self._attach_flow = "menu"
+
+        # Asegurar que existen los directorios de sesión y de capturas
+        # (una sola vez aquí, en lugar de un stat por cada captura)
+        os.makedirs(self.data_dir, exist_ok=True)
+        self._screenshot_dir = "debug_screenshots"
+        os.makedirs(self._screenshot_dir, exist_ok=True)
+
+        self._setup_driver()
+
+    def _setup_driver(self):
+        """Obtiene el driver de Chrome compartido (o lo crea en el primer uso)"""
+        self.driver = _get_or_create_driver(self.data_dir, self.headless)
+    
+    def _take_screenshot(self, filename):
+        """
+        Toma una captura de pantalla para debug
+        
+        Args:
+            filename: Nombre del archivo para guardar la captura
+        """
+        # En producción (nivel INFO) nadie mira estas capturas: guardar cada
+        # PNG cuesta cientos de ms de CDP más la escritura a disco, así que
+        # solo se generan cuando el logging está en DEBUG
+        if not DEBUG_SCREENSHOTS and not logger.isEnabledFor(logging.DEBUG):
+            return
+
+        try:
+            filepath = os.path.join(self._screenshot_dir, filename)
+            self.driver.save_screenshot(filepath)
+            logger.info("Captura de pantalla guardada: %s", filepath)
+        except Exception as e:
+            logger.error("Error al tomar captura de pantalla: %s", e)
+    
+    @contextmanager
+    def _no_implicit_wait(self):
+        """
+        Pone a cero el implicit wait del driver durante un sondeo explícito
+
+        Si el driver tiene un implicit wait distinto de cero, cada
+        find_elements dentro de un WebDriverWait bloquea esa duración antes
+        de devolver vacío, y la latencia de cada fallo se multiplica por el
+        número de sondeos. Se guarda el valor anterior y se restaura al salir.
+        """
+        try:
+            anterior = self.driver.timeouts.implicit_wait
+        except WebDriverException:
+            anterior = 0
+        if anterior:
+            self.driver.implicitly_wait(0)
+        try:
+            yield
+        finally:
+            if anterior:
+                self.driver.implicitly_wait(anterior)
+
+    def _wait_send_complete(self, timeout=5):
+        """
+        Espera a que desaparezca la previsualización del adjunto tras enviar
+
+        Sustituye los sleep fijos de después de pulsar enviar: en cuanto el
+        overlay de adjuntos sale del DOM el mensaje ya está en camino y se
+        puede continuar de inmediato, en lugar de esperar siempre el peor
+        caso. La espera se ancla al campo de caption, que solo existe
+        mientras la previsualización está abierta; los input[type='file']
+        no sirven de ancla porque WhatsApp los mantiene siempre en el DOM
+        ocultos y la condición se cumpliría al instante.
+
+        Args:
+            timeout: Segundos de espera máxima
+
+        Returns:
+            bool: True si la previsualización desapareció dentro del plazo
+        """
+        try:
+            WebDriverWait(self.driver, timeout).until(
+                EC.invisibility_of_element_located((
+                    By.CSS_SELECTOR, self._CAPTION_CSS,
+                ))
+            )
+            return True
+        except TimeoutException:
+            return False
+
+    def _set_contenteditable(self, el, text):
+        """
+        Escribe texto en un campo contenteditable con una sola llamada JS
+
+        send_keys transmite el texto por trozos (varios comandos WebDriver en
+        mensajes largos); inyectarlo con execCommand('insertText') dispara
+        los eventos de input que espera el editor de WhatsApp en un único
+        viaje. Si el editor rechaza la inyección se recurre a send_keys.
+
+        Args:
+            el: WebElement contenteditable de destino
+            text: Texto a escribir
+        """
+        try:
+            self.driver.execute_script(
+                "arguments[0].focus(); document.execCommand('insertText', false, arguments[1]);",
+                el, text
+            )
+            # Verificar que el editor aceptó el texto antes de dar por buena
+            # la inyección (React puede ignorar eventos sintéticos)
+            if text.strip() and not (el.text or "").strip():
+                raise WebDriverException("el editor no aceptó el texto inyectado")
+            return
+        except WebDriverException:
+            pass
+        el.send_keys(text)
+
+    def _find_first_js(self, selectors, timeout=0):
+        """
+        Sondea una lista de selectores dentro del navegador con un solo comando
+
+        Tanto el bucle de querySelectorAll como la repetición con setTimeout
+        ocurren en JavaScript, así que toda la espera cuesta una única
+        llamada WebDriver en lugar de un comando HTTP por selector y por
+        sondeo. Solo devuelve elementos visibles (con cajas de render).
+
+        Args:
+            selectors: Lista de selectores CSS a probar en orden
+            timeout: Segundos de espera máxima dentro del navegador
+
+        Returns:
+            El primer WebElement visible, o None si venció el plazo
+        """
+        script = (
+            "const selectores = arguments[0];"
+            "const limite = Date.now() + arguments[1] * 1000;"
+            "const done = arguments[arguments.length - 1];"
+            "(function sondear() {"
+            "  for (const s of selectores) {"
+            "    for (const e of document.querySelectorAll(s)) {"
+            "      if (e.getClientRects().length) { done(e); return; }"
+            "    }"
+            "  }"
+            "  if (Date.now() >= limite) { done(null); return; }"
+            "  setTimeout(sondear, 100);"
+            "})();"
+        )
+        try:
+            return self.driver.execute_async_script(script, list(selectors), timeout)
+        except WebDriverException:
+            return None
+
+    def _wait_any_css(self, selectors, timeout=10, clickable=False):
+        """
+        Espera a que aparezca algún elemento de una lista de selectores CSS
+
+        Delega el sondeo completo en _find_first_js: una sola llamada
+        WebDriver cubre todos los selectores y toda la ventana de espera.
+
+        Args:
+            selectors: Tupla de selectores CSS (o una unión "a, b, c")
+            timeout: Segundos de espera máxima total
+            clickable: Si es True exige además que el elemento esté habilitado
+
+        Returns:
+            El primer WebElement visible que coincida, o None
+        """
+        if isinstance(selectors, str):
+            selectors = [sel.strip() for sel in selectors.split(",")]
+
+        element = self._find_first_js(selectors, timeout)
+        if element is None:
+            return None
+        try:
+            if clickable and not element.is_enabled():
+                return None
+        except WebDriverException:
+            return None
+        return element
+
+    def _find_first(self, key, selectors, timeout=10, clickable=True):
+        """
+        Busca el primer selector de la lista que aparezca en la página
+
+        Memoriza el selector ganador bajo `key` en self._selector_cache: la
+        siguiente llamada lo prueba directo (espera corta de 1 s) y solo si
+        falla vuelve a recorrer la lista completa.
+
+        Args:
+            key: Nombre de la acción, usado como clave de la caché
+            selectors: Tupla de selectores CSS a probar en orden
+            timeout: Segundos de espera máxima por selector
+            clickable: Si es True exige que el elemento sea clicable
+
+        Returns:
+            El WebElement encontrado, o None si ningún selector funcionó
+        """
+        condition = EC.element_to_be_clickable if clickable else EC.presence_of_element_located
+
+        cached = self._selector_cache.get(key)
+        if cached:
+            try:
+                with self._no_implicit_wait():
+                    return WebDriverWait(self.driver, 1).until(
+                        condition((By.CSS_SELECTOR, cached))
+                    )
+            except (TimeoutException, NoSuchElementException, WebDriverException):
+                del self._selector_cache[key]
+
+        # Sondeo en una sola consulta batched sobre la unión de selectores
+        element = self._wait_any_css(selectors, timeout, clickable=clickable)
+        if element is None:
+            return None
+
+        # Identificar qué selector coincidió (una sola llamada JS) para que
+        # el próximo envío vaya directo por la caché
+        try:
+            idx = self.driver.execute_script(
+                "const el = arguments[0];"
+                "return arguments[1].findIndex(s => el.matches(s));",
+                element,
+                list(selectors),
+            )
+            if idx is not None and idx >= 0:
+                self._selector_cache[key] = selectors[idx]
+        except WebDriverException:
+            pass
+        return element
+
+    def start(self):
+        """Inicia WhatsApp Web y verifica la autenticación - Versión optimizada sin espera de QR"""
+        logger.info("Iniciando WhatsApp Web (modo rápido)...")
+        
+        try:
+            self.driver.get("https://web.whatsapp.com/")
+            
+            # Tiempo máximo de espera: 10 segundos (asumiendo que ya está conectado)
+            wait_time = 10
+            print(f"Esperando a que cargue WhatsApp Web (máximo {wait_time} segundos)...")
+            
+            # Un solo wait sobre la unión CSS de todos los selectores:
+            # el primero que aparezca gana y la espera total queda acotada a wait_time
+            loaded = False
+            try:
+                WebDriverWait(self.driver, wait_time).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, self._LOADED_CSS))
+                )
+                loaded = True
+                logger.info("WhatsApp Web cargado correctamente")
+            except TimeoutException:
+                pass
+            
+            # Si ningún selector funcionó pero la URL cambió, considera que está cargado
+            if not loaded:
+                current_url = self.driver.current_url
+                if "web.whatsapp.com" in current_url and not "/welcome" in current_url:
+                    loaded = True
+                    logger.info("WhatsApp Web parece estar cargado basado en la URL")
+            
+            # Si no se pudo cargar, intentar una vez más con un tiempo de espera extendido
+            if not loaded:
+                logger.warning("No se detectó carga de WhatsApp Web. Verificando si necesita escanear QR...")
+                
+                # Tomar captura para ver si muestra código QR
+                self._take_screenshot("whatsapp_loading_screen.png")
+                
+                # Extender tiempo de espera si parece que está mostrando QR:
+                # esperar a que el canvas del QR desaparezca en lugar de dormir a ciegas
+                extended_wait = 30
+                print(f"Es posible que necesites escanear el código QR. Espera hasta {extended_wait} segundos adicionales...")
+
+                try:
+                    WebDriverWait(self.driver, extended_wait).until(
+                        EC.invisibility_of_element_located((By.CSS_SELECTOR, "canvas[aria-label*='Scan']"))
+                    )
+                except TimeoutException:
+                    pass
+                
+                # Verificar una vez más si ya está cargado
+                if self.driver.find_elements(By.CSS_SELECTOR, self._LOADED_CSS):
+                    loaded = True
+                    logger.info("WhatsApp Web cargado después de espera extendida")
+            
+            if loaded:
+                self._detectar_flujo_adjuntos()
+                return True
+            else:
+                logger.error("No se pudo detectar que WhatsApp Web haya cargado correctamente")
+                return False
+                
+        except Exception as e:
+            logger.error("Error al iniciar WhatsApp Web: %s", e)
+            return False
+    
+    def _detectar_flujo_adjuntos(self):
+        """
+        Detecta una sola vez qué flujo de adjuntos usa esta build de WhatsApp
+
+        Las builds modernas abren el selector de archivos directamente desde
+        el botón de adjuntar; solo las antiguas muestran el submenú de
+        Imagen/Documento. Saberlo de antemano permite a send_image saltarse
+        el sondeo del submenú (hasta 3 s perdidos por imagen). Si la versión
+        no se puede leer se conserva el flujo conservador con submenú.
+        """
+        try:
+            version = self.driver.execute_script(
+                "return window.Debug && window.Debug.VERSION;"
+            )
+            if version and int(version.split(".")[0]) >= 2:
+                self._attach_flow = "direct"
+            else:
+                self._attach_flow = "menu"
+            logger.info("WhatsApp Web %s: flujo de adjuntos '%s'", version, self._attach_flow)
+        except Exception:
+            self._attach_flow = "menu"
+
+    def find_chat(self, phone_number):
+        """
+        Busca o inicia un chat con un número específico en WhatsApp Web 2025
+        
+        Args:
+            phone_number: Número de teléfono con código de país (ej: "573042535003")
+        
+        Returns:
+            bool: True si se encontró/inició el chat, False en caso contrario
+        """
+        try:
+            # Limpiar el número y asegurar que tiene el formato correcto
+            clean_number = _normalize_phone(phone_number)
+
+            # Atajo: si el chat de este número ya está abierto (p. ej. mensaje
+            # seguido de factura), no hace falta volver a navegar
+            if self._current_chat == clean_number and self.driver.find_elements(
+                    By.CSS_SELECTOR, "#main div[contenteditable='true']"):
+                logger.info("Chat de %s ya abierto, se reutiliza", clean_number)
+                return True
+
+            logger.info("Buscando chat para el número: %s", clean_number)
+            
+            # Método 1: URL directa (método más confiable)
+            self.driver.get(f"https://web.whatsapp.com/send?phone={clean_number}")
+            logger.info("Navegando a URL directa de WhatsApp")
+            
+            # Esperar más tiempo (45 segundos) para cargar completamente
+            try:
+                # Intentar detectar panel de conversación con múltiples selectores posibles
+                try:
+                    WebDriverWait(self.driver, 10).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, self._CONV_PANEL_CSS))
+                    )
+                    logger.info("Chat abierto correctamente")
+
+                    # Esperar a que el campo de redacción sea interactuable (carga completa)
+                    try:
+                        WebDriverWait(self.driver, 10).until(
+                            EC.element_to_be_clickable((By.CSS_SELECTOR, "#main div[contenteditable='true']"))
+                        )
+                    except TimeoutException:
+                        pass
+                    self._current_chat = clean_number
+                    return True
+                except TimeoutException:
+                    # Ninguno de los selectores apareció dentro del tiempo de espera
+                    logger.warning("No se pudo detectar el panel de conversación con ningún selector conocido")
+            except Exception as e:
+                logger.warning("Método 1 falló: %s", e)
+                
+            # Verificar si hay mensaje de error antes de continuar: una sola
+            # evaluación XPath cubre todos los textos, y find_elements no lanza
+            # excepción en el caso habitual de que no haya error
+            if self.driver.find_elements(By.XPATH, self._ERROR_XPATH):
+                logger.error("WhatsApp indica que hay un problema con el número")
+                return False
+            
+            # Método 2: Usar el campo de búsqueda
+            try:
+                # Volver a la página principal
+                self.driver.get("https://web.whatsapp.com/")
+                logger.info("Volviendo a la página principal para intentar búsqueda manual")
+
+                # Buscar el campo de búsqueda (el WebDriverWait interno ya cubre la carga)
+                search_box = self._find_first("search", self._SEARCH_SELECTORS, clickable=False)
+                
+                if search_box:
+                    # Limpiar y usar el número
+                    search_box.clear()
+                    search_box.send_keys(clean_number)
+                    logger.info("Buscando número: %s", clean_number)
+
+                    # Intentar hacer clic en el resultado (si existe)
+                    try:
+                        chat_results = WebDriverWait(self.driver, 10).until(
+                            EC.presence_of_all_elements_located((By.CSS_SELECTOR, "div[role='row']"))
+                        )
+                        if chat_results and len(chat_results) > 0:
+                            chat_results[0].click()
+                            logger.info("Se hizo clic en el primer resultado de la búsqueda")
+                            WebDriverWait(self.driver, 10).until(
+                                EC.presence_of_element_located((By.CSS_SELECTOR, "#main"))
+                            )
+                            self._current_chat = clean_number
+                            return True
+                    except Exception as e:
+                        logger.warning("No se pudo hacer clic en el resultado: %s", e)
+                else:
+                    logger.warning("No se pudo encontrar el campo de búsqueda")
+            except Exception as e:
+                logger.warning("Método 2 falló: %s", e)
+             
+            # Método 3: Intentar buscar por el número exacto
+            try:
+                # Intentar encontrar directamente el chat por el número
+                chat_selector = f"//span[contains(@title, '{clean_number}')]"
+                chat_element = self.driver.find_element(By.XPATH, chat_selector)
+                if chat_element:
+                    chat_element.click()
+                    logger.info("Chat encontrado y seleccionado por número visible")
+                    WebDriverWait(self.driver, 10).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, "#main"))
+                    )
+                    self._current_chat = clean_number
+                    return True
+            except (TimeoutException, NoSuchElementException, WebDriverException):
+                logger.warning("No se pudo encontrar el chat directamente por número")
+                
+            # Si llegamos aquí, todos los métodos fallaron
+            self._current_chat = None
+            logger.error("Todos los métodos para encontrar el chat fallaron")
+            return False
+        except Exception as e:
+            self._current_chat = None
+            logger.error("Error general al buscar chat: %s", e)
+            return False
+
+    def send_message(self, phone_number, message):
+        """
+        Envía un mensaje a un número específico
+        
+        Args:
+            phone_number: Número de teléfono con código de país
+            message: Mensaje a enviar
+            
+        Returns:
+            bool: True si se envió correctamente, False en caso contrario
+        """
+        try:
+            # Primero encontrar/abrir el chat
+            if not self.find_chat(phone_number):
+                logger.error("No se pudo abrir el chat para enviar mensaje")
+                return False
+                
+            # Esperar a que el campo de redacción esté listo en lugar de dormir a ciegas
+            try:
+                WebDriverWait(self.driver, 10).until(
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, "#main div[contenteditable='true']"))
+                )
+            except TimeoutException:
+                pass
+            logger.info("Chat abierto, preparando para enviar mensaje...")
+            
+            # Intentar diferentes selectores para el campo de texto
+            input_box = None
+            try:
+                input_box = WebDriverWait(self.driver, 10).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, self._INPUT_CSS))
+                )
+                logger.info("Campo de texto encontrado")
+            except TimeoutException:
+                pass
+            
+            if not input_box:
+                self._current_chat = None
+                logger.error("No se pudo encontrar el campo de texto para enviar mensaje")
+                self._take_screenshot("error_send_message.png")
+                return False
+            
+            # Enviar el mensaje de una forma más robusta
+            try:
+                # Método 1: Inyectar el texto completo de una sola vez vía JavaScript
+                # (una sola llamada WebDriver en lugar de un viaje por cada trozo de 50 caracteres)
+                input_box.clear()
+                self._set_contenteditable(input_box, message)
+
+                # Tomar captura del momento antes de enviar
+                self._take_screenshot("before_send.png")
+                logger.info("Mensaje escrito correctamente, buscando botón de enviar...")
+                
+                # Buscar botón de enviar con múltiples selectores
+                send_button = None
+                try:
+                    send_button = WebDriverWait(self.driver, 5).until(
+                        EC.element_to_be_clickable((By.CSS_SELECTOR, self._SEND_CSS))
+                    )
+                    logger.info("Botón de enviar encontrado")
+                except TimeoutException:
+                    pass
+
+                if send_button:
+                    send_button.click()
+                    logger.info("Botón de enviar presionado")
+                else:
+                    # Alternativa: Usar tecla ENTER
+                    logger.info("Usando ENTER como alternativa para enviar")
+                    input_box.send_keys(Keys.ENTER)
+                
+                # Esperar a que el campo quede vacío (el mensaje salió del cuadro de redacción)
+                try:
+                    WebDriverWait(self.driver, 5).until(
+                        lambda d: not input_box.text.strip()
+                    )
+                except Exception:
+                    pass
+                logger.info("Mensaje enviado correctamente a %s", phone_number)
+                return True
+                
+            except Exception as e:
+                self._current_chat = None
+                logger.error("Error al enviar el mensaje: %s", e)
+                return False
+                
+        except Exception as e:
+            self._current_chat = None
+            logger.error("Error general en send_message: %s", e)
+            return False
+    
+    def _abrir_menu_adjuntar(self):
+        """
+        Abre el menú de adjuntar y selecciona la opción de documento si existe
+
+        Returns:
+            bool: True si se pudo abrir el menú, False en caso contrario
+        """
+        # PASO 1: Encontrar y hacer clic en el botón de adjuntar (clip o +)
+        attach_button = None
+        try:
+            attach_button = WebDriverWait(self.driver, 10).until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, self._ATTACH_CSS))
+            )
+            logger.info("Botón de adjuntar encontrado")
+        except TimeoutException:
+            pass
+
+        if not attach_button:
+            logger.error("No se pudo encontrar el botón para adjuntar archivos")
+            self._take_screenshot("error_no_attach_button.png")
+            return False
+
+        attach_button.click()
+        logger.info("Clic en botón de adjuntar realizado")
+
+        # PASO 2: Seleccionar la opción de documento si hay menú intermedio
+        try:
+            option = WebDriverWait(self.driver, 3).until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, self._DOC_OPTION_CSS))
+            )
+            option.click()
+            logger.info("Opción de documento encontrada y seleccionada")
+        except TimeoutException:
+            # Algunas versiones exponen el input de archivo sin menú intermedio
+            pass
+
+        return True
+
+    def send_document(self, phone_number, file_path, caption=None):
+        """
+        Envía un documento (PDF, Excel, etc.) a un número específico por WhatsApp
+        
+        Args:
+            phone_number: Número de teléfono con código de país
+            file_path: Ruta absoluta al archivo para enviar
+            caption: Texto opcional para el documento
+            
+        Returns:
+            bool: True si se envió correctamente, False en caso contrario
+        """
+        try:
+            # Asegurar que el archivo existe
+            if not os.path.exists(file_path):
+                logger.error("Archivo no encontrado: %s", file_path)
+                return False
+                
+            # Abrir chat
+            if not self.find_chat(phone_number):
+                logger.error("No se pudo abrir el chat para enviar documento")
+                return False
+            
+            # Tomar captura del chat abierto
+            self._take_screenshot("before_attach_document.png")
+
+            # ATAJO: WhatsApp Web mantiene los <input type="file"> ocultos en el
+            # DOM desde el principio, así que normalmente se puede enviar la ruta
+            # directamente sin abrir el menú de adjuntar (ahorra dos clics con
+            # sus esperas). Se elige el input que acepta documentos.
+            file_input = None
+            try:
+                for candidato in self.driver.find_elements(By.CSS_SELECTOR, "input[type='file']"):
+                    # El input de medios declara accept="image/*,video/mp4,...";
+                    # solo vale el input sin restricciones ("*" a secas o sin
+                    # accept) o el que admite documentos explícitamente
+                    accept = (candidato.get_attribute("accept") or "").strip()
+                    if not accept or accept == "*" or ".pdf" in accept or ".xlsx" in accept:
+                        file_input = candidato
+                        logger.info("Input de archivo encontrado sin abrir el menú de adjuntar")
+                        break
+            except WebDriverException:
+                file_input = None
+
+            if file_input is None:
+                # RUTA LENTA: abrir el menú de adjuntar con clics
+                if not self._abrir_menu_adjuntar():
+                    return False
+
+            # PASO 3: Subir el archivo al input de tipo file
+            try:
+                if file_input is None:
+                    # Tomar captura antes de buscar el input
+                    self._take_screenshot("before_file_input.png")
+
+                    file_input = WebDriverWait(self.driver, 10).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='file']"))
+                    )
+                
+                # Asegurar ruta absoluta y enviar al input (solo resolver
+                # si el llamador pasó una ruta relativa)
+                abs_file_path = file_path if os.path.isabs(file_path) else os.path.abspath(file_path)
+                file_input.send_keys(abs_file_path)
+                logger.info("Archivo seleccionado: %s", abs_file_path)
+
+                # Los WebDriverWait siguientes (comentario/botón de enviar) ya
+                # cubren el tiempo de carga de la previsualización
+                logger.info("Archivo cargado, buscando campo de comentario...")
+                
+                # PASO 4: Si hay caption, intentar escribirlo
+                if caption:
+                    try:
+                        caption_field = None
+                        try:
+                            caption_field = WebDriverWait(self.driver, 8).until(
+                                EC.presence_of_element_located((By.CSS_SELECTOR, self._CAPTION_CSS))
+                            )
+                            logger.info("Campo de comentario encontrado")
+                        except TimeoutException:
+                            pass
+
+                        if caption_field:
+                            caption_field.clear()
+                            self._set_contenteditable(caption_field, caption)
+                            logger.info("Comentario agregado al archivo")
+                            
+                            # IMPORTANTE: Presionar ENTER después de escribir el comentario
+                            caption_field.send_keys(Keys.ENTER)
+                            logger.info("Tecla ENTER presionada después del comentario")
+
+                            # Si el mensaje se envió con Enter, la pantalla de adjuntar desaparece
+                            if self._wait_send_complete():
+                                logger.info("Documento enviado con Enter después del comentario")
+                                return True
+                        else:
+                            logger.warning("No se pudo encontrar el campo para agregar comentario")
+                    except Exception as e:
+                        logger.warning("Error al agregar comentario: %s", e)
+                
+                # PASO 5: Buscar y hacer clic en el botón de enviar
+                # Tomar captura antes de buscar el botón de enviar
+                self._take_screenshot("before_send_file.png")
+                
+                send_button = None
+                try:
+                    send_button = WebDriverWait(self.driver, 10).until(
+                        EC.element_to_be_clickable((By.CSS_SELECTOR, self._FILE_SEND_CSS))
+                    )
+                    logger.info("Botón de enviar archivo encontrado")
+                except TimeoutException:
+                    pass
+
+                if send_button:
+                    send_button.click()
+                    logger.info("Botón de enviar archivo presionado")
+                else:
+                    # ALTERNATIVA: Usar la tecla ENTER si no se encuentra el botón.
+                    # document.activeElement ya es el campo que nos interesa, así
+                    # que no hace falta recorrer selectores buscándolo
+                    logger.info("No se encontró botón de enviar, intentando con ENTER...")
+                    self.driver.switch_to.active_element.send_keys(Keys.ENTER)
+                    logger.info("ENTER enviado al elemento activo de la página")
+                
+                # Esperar a que se envíe (archivos grandes pueden tardar más)
+                self._wait_send_complete(timeout=10)
+                logger.info("Documento enviado correctamente a %s", phone_number)
+                return True
+                
+            except Exception as e:
+                logger.error("Error al seleccionar o enviar archivo: %s", e)
+                self._take_screenshot("error_file_upload.png")
+                return False
+                
+        except Exception as e:
+            logger.error("Error general al enviar documento: %s", e)
+            return False
+    
+    def send_image(self, phone_number, image_path, caption=None):
+        """
+        Envía una imagen a un número específico
+        
+        Args:
+            phone_number: Número de teléfono con código de país
+            image_path: Ruta absoluta a la imagen
+            caption: Texto opcional para la imagen
+            
+        Returns:
+            bool: True si se envió correctamente, False en caso contrario
+        """
+        try:
+            # Abrir chat
+            if not self.find_chat(phone_number):
+                return False
+            
+            # Hacer clic en el botón de adjuntar
+            attach_button = self._find_first("attach", self._ATTACH_SELECTORS)
+            if not attach_button:
+                logger.error("No se pudo encontrar el botón para adjuntar")
+                return False
+                
+            attach_button.click()
+            
+            # Solo las builds antiguas muestran el submenú de Imagen; en el
+            # flujo directo el sondeo se salta por completo
+            if self._attach_flow == "menu":
+                option = self._find_first("image_option", self._IMAGE_OPTION_SELECTORS, timeout=3)
+                if option:
+                    option.click()
+                    time.sleep(1)
+            
+            # Seleccionar opción de imagen
+            image_input = WebDriverWait(self.driver, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='file']"))
+            )
+            
+            # Enviar ruta de imagen al input
+            if not os.path.isabs(image_path):
+                image_path = os.path.abspath(image_path)  # Asegurar ruta absoluta
+            image_input.send_keys(image_path)
+            
+            # Si hay caption, escribirlo
+            if caption:
+                caption_field = self._find_first(
+                    "caption", self._CAPTION_SELECTORS, timeout=8, clickable=False
+                )
+                if caption_field:
+                    caption_field.clear()
+                    self._set_contenteditable(caption_field, caption)
+                    # Intentar con Enter
+                    caption_field.send_keys(Keys.ENTER)
+
+                    # Si la previsualización desaparece, el Enter ya envió la imagen
+                    if self._wait_send_complete():
+                        logger.info("Imagen enviada con Enter después del comentario")
+                        return True
+            
+            # Hacer clic en enviar
+            send_button = self._find_first("file_send", self._FILE_SEND_SELECTORS)
+            if send_button:
+                send_button.click()
+            else:
+                # Enviar ENTER al elemento con el foco (un solo comando WebDriver)
+                self.driver.switch_to.active_element.send_keys(Keys.ENTER)
+                logger.info("ENTER enviado al elemento activo para enviar imagen")
+            
+            # Esperar a que se envíe
+            self._wait_send_complete()
+            logger.info("Imagen enviada correctamente a %s", phone_number)
+            return True
+        except Exception as e:
+            logger.error("Error al enviar imagen a %s: %s", phone_number, e)
+            return False
+    
+    async def send_message_async(self, phone_number, message):
+        """Versión asyncio de send_message (ejecuta el envío en un hilo)"""
+        return await asyncio.to_thread(self.send_message, phone_number, message)
+
+    async def send_document_async(self, phone_number, file_path, caption=None):
+        """Versión asyncio de send_document (ejecuta el envío en un hilo)"""
+        return await asyncio.to_thread(self.send_document, phone_number, file_path, caption)
+
+    @staticmethod
+    async def broadcast(pairs, concurrency=4):
+        """
+        Envía varios mensajes concurrentemente con un límite de envíos en vuelo
+
+        Con el backend de Cloud API cada envío es una petición HTTP y la
+        concurrencia es real; con el driver de Selenium compartido cada
+        envío toma _selenium_send_lock y el navegador se usa de uno en
+        uno, aunque la preparación de los mensajes se siga solapando.
+
+        Args:
+            pairs: Iterable de tuplas (telefono, mensaje)
+            concurrency: Número máximo de envíos simultáneos
+
+        Returns:
+            list: Resultados booleanos en el mismo orden que pairs
+        """
+        semaforo = asyncio.Semaphore(concurrency)
+
+        def _enviar_por_selenium(bot, telefono, mensaje):
+            # El Chrome compartido solo admite un hilo a la vez
+            with _selenium_send_lock:
+                if not bot.start():
+                    return False
+                return bot.send_message(telefono, mensaje)
+
+        async def _enviar(telefono, mensaje):
+            async with semaforo:
+                bot = crear_bot_whatsapp()
+                try:
+                    if isinstance(bot, WhatsAppBot):
+                        return await asyncio.to_thread(
+                            _enviar_por_selenium, bot, telefono, mensaje)
+                    if not await asyncio.to_thread(bot.start):
+                        return False
+                    return await asyncio.to_thread(bot.send_message, telefono, mensaje)
+                finally:
+                    bot.close()
+
+        return await asyncio.gather(*(_enviar(t, m) for t, m in pairs))
+
+    def close(self):
+        """
+        Libera esta instancia del bot. El driver compartido se mantiene vivo
+        para que el próximo envío no pague el arranque de Chrome; usar
+        WhatsAppBot.close_pool() al terminar el proceso.
+        """
+        self.driver = None
+
+    @staticmethod
+    def close_pool():
+        """Cierra el driver de Chrome compartido y finaliza la sesión"""
+        global _driver_singleton
+        if _driver_singleton is not None:
+            try:
+                _driver_singleton.quit()
+            except Exception as e:
+                logger.warning("Error al cerrar el driver compartido: %s", e)
+            _driver_singleton = None
+            logger.info("Sesión de WhatsApp cerrada")
+
+
+# Asegurar que el Chrome compartido se cierre al terminar el proceso
+atexit.register(WhatsAppBot.close_pool)
+
+# Credenciales de la API oficial de WhatsApp (Cloud API). Si están configuradas
+# en el entorno, los envíos usan una petición HTTPS (decenas de ms) en lugar de
+# automatizar Chrome, cuyo coste dominante es el renderizado del navegador.
+WHATSAPP_TOKEN = os.getenv("WHATSAPP_TOKEN")
+WHATSAPP_PHONE_ID = os.getenv("WHATSAPP_PHONE_ID")
+GRAPH_API_URL = "https://graph.facebook.com/v19.0"
+
+
+class WhatsAppCloudBot:
+    """
+    Backend alternativo que envía mensajes y documentos por la API oficial
+    de WhatsApp (Cloud API) en lugar de automatizar Chrome con Selenium.
+    Mantiene la misma interfaz pública que WhatsAppBot (start, send_message,
+    send_document, close) para poder intercambiarlos.
+    """
+
+    def __init__(self, token=None, phone_id=None):
+        self.token = token or WHATSAPP_TOKEN
+        self.phone_id = phone_id or WHATSAPP_PHONE_ID
+        if not self.token or not self.phone_id:
+            raise ValueError(
+                "Se requieren WHATSAPP_TOKEN y WHATSAPP_PHONE_ID para usar la Cloud API"
+            )
+
+    def start(self):
+        """No hay navegador que arrancar; la API está lista de inmediato"""
+        return True
+
+    def _post(self, path, payload=None, data=None, content_type=None):
+        """
+        Hace un POST autenticado al endpoint indicado de la Graph API
+
+        Args:
+            path: Ruta relativa al número ("messages", "media")
+            payload: Diccionario a serializar como JSON (excluyente con data)
+            data: Cuerpo ya codificado (para multipart)
+            content_type: Content-Type del cuerpo cuando se pasa data
+        """
+        import urllib.request
+
+        if payload is not None:
+            data = json.dumps(payload).encode("utf-8")
+            content_type = "application/json"
+
+        req = urllib.request.Request(
+            f"{GRAPH_API_URL}/{self.phone_id}/{path}", data=data, method="POST"
+        )
+        req.add_header("Authorization", f"Bearer {self.token}")
+        req.add_header("Content-Type", content_type)
+
+        with urllib.request.urlopen(req, timeout=30) as respuesta:
+            return json.loads(respuesta.read().decode("utf-8"))
+
+    def send_message(self, phone_number, message):
+        """
+        Envía un mensaje de texto a un número específico
+
+        Args:
+            phone_number: Número de teléfono con código de país
+            message: Mensaje a enviar
+
+        Returns:
+            bool: True si se envió correctamente, False en caso contrario
+        """
+        try:
+            self._post("messages", payload={
+                "messaging_product": "whatsapp",
+                "to": _normalize_phone(phone_number),
+                "type": "text",
+                "text": {"body": message},
+            })
+            logger.info("Mensaje enviado por Cloud API a %s", phone_number)
+            return True
+        except Exception as e:
+            logger.error("Error al enviar mensaje por Cloud API: %s", e)
+            return False
+
+    def _upload_media(self, file_path):
+        """Sube un archivo al endpoint /media y devuelve su id"""
+        import mimetypes
+
+        mime = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+        boundary = "----SamirsBurgers" + os.urandom(8).hex()
+
+        with open(file_path, "rb") as archivo:
+            contenido = archivo.read()
+
+        cuerpo = b"".join([
+            (f"--{boundary}\r\n"
+             "Content-Disposition: form-data; name=\"messaging_product\"\r\n\r\n"
+             "whatsapp\r\n").encode("utf-8"),
+            (f"--{boundary}\r\n"
+             "Content-Disposition: form-data; name=\"file\"; "
+             f"filename=\"{os.path.basename(file_path)}\"\r\n"
+             f"Content-Type: {mime}\r\n\r\n").encode("utf-8"),
+            contenido,
+            f"\r\n--{boundary}--\r\n".encode("utf-8"),
+        ])
+
+        respuesta = self._post(
+            "media", data=cuerpo,
+            content_type=f"multipart/form-data; boundary={boundary}"
+        )
+        return respuesta["id"]
+
+    def send_document(self, phone_number, file_path, caption=None):
+        """
+        Envía un documento (PDF, Excel, etc.) a un número específico
+
+        Args:
+            phone_number: Número de teléfono con código de país
+            file_path: Ruta al archivo para enviar
+            caption: Texto opcional para el documento
+
+        Returns:
+            bool: True si se envió correctamente, False en caso contrario
+        """
+        if not os.path.exists(file_path):
+            logger.error("Archivo no encontrado: %s", file_path)
+            return False
+
+        try:
+            documento = {
+                "id": self._upload_media(file_path),
+                "filename": os.path.basename(file_path),
+            }
+            if caption:
+                documento["caption"] = caption
+
+            self._post("messages", payload={
+                "messaging_product": "whatsapp",
+                "to": _normalize_phone(phone_number),
+                "type": "document",
+                "document": documento,
+            })
+            logger.info("Documento enviado por Cloud API a %s", phone_number)
+            return True
+        except Exception as e:
+            logger.error("Error al enviar documento por Cloud API: %s", e)
+            return False
+
+    def close(self):
+        """No hay recursos que liberar en el backend HTTP"""
+        pass
+
+
+def crear_bot_whatsapp():
+    """
+    Crea el backend de WhatsApp disponible: Cloud API si hay credenciales
+    configuradas en el entorno, o Selenium como respaldo.
+    """
+    if WHATSAPP_TOKEN and WHATSAPP_PHONE_ID:
+        return WhatsAppCloudBot()
+    return WhatsAppBot()
+
+
+class WhatsAppBotPool:
+    """
+    Pool de bots de WhatsApp ya arrancados y listos para enviar
+
+    Crear un bot por mensaje obligaba a pagar el arranque del backend en
+    cada envío; el pool los mantiene calientes y los presta mediante un
+    context manager. Con Cloud API cada bot es independiente y se puede
+    enviar desde varios hilos a la vez; con Selenium todos los bots
+    envolverían el mismo Chrome compartido, así que el pool se limita a
+    uno para que los préstamos serialicen el acceso al driver.
+    """
+
+    def __init__(self, size=2):
+        if not (WHATSAPP_TOKEN and WHATSAPP_PHONE_ID):
+            size = 1  # Backend Selenium: un solo Chrome, un solo bot
+        self._size = size
+        self._queue = queue.Queue(maxsize=size)
+        self._lock = threading.Lock()
+        self._creados = 0
+        self._bots = []
+
+    def _crear_bot(self):
+        """Crea y arranca un bot nuevo (Cloud API o Selenium según el entorno)"""
+        bot = crear_bot_whatsapp()
+        if not bot.start():
+            raise RuntimeError("No se pudo iniciar el bot de WhatsApp")
+        return bot
+
+    @contextmanager
+    def acquire(self, timeout=None):
+        """
+        Presta un bot del pool y lo devuelve al salir del bloque with
+
+        El primer acquire arranca el bot de forma perezosa; cuando el pool
+        está al máximo, espera a que otro hilo devuelva el suyo.
+        """
+        try:
+            bot = self._queue.get_nowait()
+        except queue.Empty:
+            bot = None
+            with self._lock:
+                if self._creados < self._size:
+                    self._creados += 1
+                    try:
+                        bot = self._crear_bot()
+                        self._bots.append(bot)
+                    except Exception:
+                        self._creados -= 1
+                        raise
+            if bot is None:
+                bot = self._queue.get(timeout=timeout)
+
+        try:
+            yield bot
+        finally:
+            self._queue.put(bot)
+
+    def close_all(self):
+        """Cierra todos los bots del pool (se registra en atexit)"""
+        with self._lock:
+            bots, self._bots = self._bots, []
+            self._creados = 0
+        while not self._queue.empty():
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        for bot in bots:
+            try:
+                bot.close()
+            except Exception as e:
+                logger.warning("Error al cerrar un bot del pool: %s", e)
+
+
+# Pool compartido del módulo; los bots se arrancan en el primer uso
+_bot_pool = WhatsAppBotPool()
+atexit.register(_bot_pool.close_all)
+
+
+def send_whatsapp_message(phone_number, message):
+    """
+    Función de utilidad para enviar un mensaje de WhatsApp sin manejar el objeto bot
+    
+    Args:
+        phone_number: Número con código de país (ej: "573001234567")
+        message: Texto del mensaje a enviar
+        
+    Returns:
+        bool: True si se envió correctamente
+    """
+    try:
+        with _bot_pool.acquire() as bot:
+            return bot.send_message(phone_number, message)
+    except Exception as e:
+        logger.error("Error al enviar mensaje de WhatsApp: %s", e)
+        return False
+
+# Plantilla del mensaje de confirmación: el texto fijo se ensambla una sola
+# vez al importar el módulo; cada envío solo sustituye los campos del cliente
+# (_MSG_TPL es el método format ya ligado a la plantilla)
+_MSG_TPL = (
+    "🍔 *SAMIR'S BURGERS - CONFIRMACIÓN DE PEDIDO* 🍔\n\n"
+    "Hola *{nombre}*, ¡gracias por tu pedido!\n\n"
+    "*📝 RESUMEN DE TU PEDIDO:*\n{resumen}\n\n"
+    "*📍 DIRECCIÓN DE ENTREGA:*\n{direccion}\n\n"
+    "*💰 MÉTODO DE PAGO:*\n{metodo_pago}\n\n"
+    "Tu pedido está siendo preparado con todo el amor de Samir's Burgers. "
+    "Si tienes alguna duda, responde a este mensaje.\n\n"
+    "¡Buen provecho! 🍔✨"
+).format
+
+
+def mensaje_whatsapp(datos_cliente, resumen_pedido):
+    """Genera el mensaje estándar para WhatsApp"""
+    return _MSG_TPL(
+        nombre=datos_cliente['nombre'],
+        resumen=resumen_pedido,
+        direccion=datos_cliente['direccion'],
+        metodo_pago=datos_cliente['metodo_pago'],
+    )
+
+def enviar_pedido_por_whatsapp(telefono, resumen_pedido, datos_cliente):
+    """
+    Envía el resumen del pedido a un cliente por WhatsApp usando Selenium
+    
+    Args:
+        telefono: Número de teléfono del cliente (se le añadirá el código de país)
+        resumen_pedido: Texto con el resumen del pedido
+        datos_cliente: Diccionario con los datos del cliente
+        
+    Returns:
+        bool: True si se envió correctamente
+    """
+    # Formatear el número con código de país (Colombia por defecto)
+    clean_number = _normalize_phone(telefono)
+    
+    # Crear mensaje con formato
+    mensaje = mensaje_whatsapp(datos_cliente, resumen_pedido)
+    
+    # Enviar mensaje
+    return send_whatsapp_message(clean_number, mensaje)
+
+def enviar_factura_por_whatsapp(telefono, ruta_factura, datos_cliente, resumen_pedido):
+    """
+    Envía la factura Excel por WhatsApp
+    
+    Args:
+        telefono: Número de teléfono del cliente
+        ruta_factura: Ruta al archivo Excel de factura
+        datos_cliente: Datos del cliente
+        resumen_pedido: Texto del resumen del pedido
+        
+    Returns:
+        bool: True si se envió correctamente
+    """
+    # Formatear el número
+    clean_number = _normalize_phone(telefono)
+    
+    # Mensaje de factura
+    mensaje = (
+        f"🧾 *FACTURA SAMIR'S BURGERS* 🧾\n\n"
+        f"Hola *{datos_cliente['nombre']}*, a continuación te enviamos la factura de tu pedido.\n\n"
+        f"Si tienes alguna duda sobre tu factura, contáctanos al {TELEFONO_EMPRESA}.\n\n"
+        f"¡Gracias por tu compra!"
+    )
+    
+    # Tomar un bot del pool (Cloud API si hay token, Selenium si no)
+    try:
+        with _bot_pool.acquire() as bot:
+            # Primero enviar un mensaje
+            bot.send_message(clean_number, mensaje)
+
+            # Luego enviar el archivo Excel
+            caption = f"Factura Samir's Burgers - {datetime.datetime.now().strftime('%d/%m/%Y')}"
+            return bot.send_document(clean_number, ruta_factura, caption)
+    except Exception as e:
+        logger.error("Error al enviar factura por WhatsApp: %s", e)
+        return False
+
+def enviar_facturas_en_lote(items, max_workers=4):
+    """
+    Envía varias facturas por WhatsApp en paralelo
+
+    Con el backend de Cloud API cada hilo toma su propio bot del pool y
+    los envíos HTTP se solapan de verdad; con Selenium solo existe un
+    Chrome compartido, así que el lote se reduce a un único worker y los
+    envíos van en serie (el paralelismo regresa configurando la Cloud API).
+
+    Args:
+        items: Iterable de diccionarios con las claves telefono,
+               ruta_factura, datos_cliente y resumen_pedido
+        max_workers: Número máximo de envíos simultáneos
+
+    Returns:
+        list: Tuplas (telefono, bool) en orden de terminación
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    if not (WHATSAPP_TOKEN and WHATSAPP_PHONE_ID):
+        max_workers = 1  # Un solo Chrome: los envíos por Selenium van en serie
+
+    resultados = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futuros = {
+            executor.submit(enviar_factura_por_whatsapp, **item): item['telefono']
+            for item in items
+        }
+        for futuro in as_completed(futuros):
+            telefono = futuros[futuro]
+            try:
+                ok = futuro.result()
+            except Exception as e:
+                logger.error("Error al enviar la factura a %s: %s", telefono, e)
+                ok = False
+            resultados.append((telefono, ok))
+    return resultados
+
+
+###############################
+# PARTE 1B: WHATSAPP DIRECTO (QR y Enlace)
+###############################
+
+@functools.lru_cache(maxsize=1024)
+def crear_enlace_whatsapp(numero, mensaje):
+    """
+    Crea un enlace de WhatsApp que abre directamente el chat con un mensaje predefinido
+
+    Memorizada con lru_cache: el quote() de mensajes largos no es gratis y
+    los recordatorios repiten el mismo par (número, mensaje).
+    
+    Args:
+        numero: Número de teléfono (con código de país)
+        mensaje: Mensaje a enviar (será codificado para URL)
+        
+    Returns:
+        str: URL de WhatsApp
+    """
+    # Formatear el número
+    numero_limpio = _normalize_phone(numero)
+    
+    # Codificar el mensaje para URL
+    from urllib.parse import quote
+    mensaje_codificado = quote(mensaje)
+    
+    # Crear el enlace (funciona tanto en móvil como en escritorio)
+    return f"https://wa.me/{numero_limpio}?text={mensaje_codificado}"
+
+@functools.lru_cache(maxsize=256)
+def _build_qr(enlace):
+    """
+    Renderiza el PNG del código QR de un enlace y lo devuelve como bytes
+
+    La parte cara (construir la matriz del QR y codificar el PNG) depende
+    solo del enlace, así que se memoriza: reenviar el mismo mensaje al
+    mismo cliente reutiliza los bytes ya renderizados.
+
+    Args:
+        enlace: URL de WhatsApp a codificar
+
+    Returns:
+        bytes: Contenido del PNG
+    """
+    import io
+    import qrcode
+
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(enlace)
+    qr.make(fit=True)
+
+    buffer = io.BytesIO()
+    try:
+        # Backend PNG puro (pypng): para un QR en blanco y negro no hace
+        # falta inicializar Pillow entero con sus extensiones en C
+        from qrcode.image.pure import PyPNGImage
+        qr.make_image(image_factory=PyPNGImage).save(buffer)
+    except ImportError:
+        img = qr.make_image(fill_color="black", back_color="white")
+        img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def generar_qr_whatsapp(numero, mensaje, guardar=True):
+    """
+    Genera un código QR que al escanearse abre WhatsApp con un mensaje predefinido
+    
+    Args:
+        numero: Número de teléfono (con código de país)
+        mensaje: Mensaje a enviar 
+        guardar: Si es True, guarda el QR como imagen
+        
+    Returns:
+        str: Ruta a la imagen QR generada o None si no se guardó
+    """
+    if not QR_DISPONIBLE:
+        print("Error: Para generar códigos QR, instala: pip install qrcode[pil]")
+        return None
+
+    try:
+        # Crear el enlace y renderizar (o reutilizar) el PNG del QR
+        enlace = crear_enlace_whatsapp(numero, mensaje)
+        datos_png = _build_qr(enlace)
+
+        if guardar:
+            # Crear nombre de archivo con timestamp
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"whatsapp_qr_{timestamp}.png"
+            with open(filename, "wb") as f:
+                f.write(datos_png)
+            print(f"Código QR guardado como: {filename}")
+            return filename
+        else:
+            return None
+    except Exception as e:
+        print(f"Error al generar código QR: {e}")
+        return None
+
+def abrir_chat_directo(numero, mensaje):
+    """
+    Abre directamente el navegador predeterminado con el enlace de WhatsApp
+    
+    Args:
+        numero: Número de teléfono (con código de país)
+        mensaje: Mensaje a enviar
+        
+    Returns:
+        bool: True si se pudo abrir el navegador
+    """
+    try:
+        import webbrowser
+
+        enlace = crear_enlace_whatsapp(numero, mensaje)
+        webbrowser.open(enlace)
+        print(f"Enlace de WhatsApp abierto: {enlace}")
+        return True
+    except Exception as e:
+        print(f"Error al abrir enlace de WhatsApp: {e}")
+        return False
+
+def enviar_pedido_whatsapp_directo(telefono, resumen_pedido, datos_cliente):
+    """
+    Crea un código QR y un enlace directo para enviar el pedido por WhatsApp
+    
+    Args:
+        telefono: Número de teléfono del cliente
+        resumen_pedido: Texto con el resumen del pedido
+        datos_cliente: Diccionario con los datos del cliente
+        
+    Returns:
+        dict: Diccionario con enlace, ruta del QR y éxito de apertura
+    """
+    # Crear mensaje formateado
+    mensaje = mensaje_whatsapp(datos_cliente, resumen_pedido)
+    
+    # Crear el enlace
+    enlace = crear_enlace_whatsapp(telefono, mensaje)
+    
+    # Generar código QR
+    qr_path = generar_qr_whatsapp(telefono, mensaje) if QR_DISPONIBLE else None
+    
+    # Preguntar si desea abrir el navegador
+    print("\n¿Deseas abrir el enlace de WhatsApp en tu navegador? (s/n): ", end="")
+    respuesta = input().strip().lower()
+    
+    browser_opened = False
+    if respuesta == 's' or respuesta == 'si' or respuesta == 'y' or respuesta == 'yes':
+        browser_opened = abrir_chat_directo(telefono, mensaje)
+    
+    # Mostrar instrucciones
+    print("\n📱 INSTRUCCIONES PARA ENVIAR EL PEDIDO POR WHATSAPP:")
+    if qr_path:
+        print(f"1. OPCIÓN 1: Escanea el código QR generado ({qr_path})")
+    print(f"2. OPCIÓN 2: Abre este enlace manualmente:")
+    print(f"   {enlace}")
+    print("3. El chat de WhatsApp se abrirá con el mensaje listo para enviar")
+    print("4. Solo haz clic en el botón de ENVIAR en WhatsApp\n")
+    
+    return {
+        'enlace': enlace,
+        'qr_path': qr_path,
+        'browser_opened': browser_opened
+    }
+
+###############################
+# PARTE 2: FACTURAS EXCEL
+###############################
+
+# Contador de facturas en sqlite: incrementar es una única sentencia atómica
+# en lugar de leer, parsear y reescribir el JSON completo por factura, y el
+# modo WAL evita la carrera entre facturas concurrentes del pool de bots
+try:
+    import sqlite3
+except ImportError:
+    sqlite3 = None
+
+_contador_conn = None
+_contador_lock = threading.Lock()
+
+
+def _contador_sqlite():
+    """Devuelve la conexión compartida al contador, creándola en el primer uso"""
+    global _contador_conn
+    if sqlite3 is None:
+        return None
+    if _contador_conn is None:
+        conn = sqlite3.connect("invoice_count.db", isolation_level=None,
+                               check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS daily (date TEXT PRIMARY KEY, n INTEGER NOT NULL)"
+        )
+        _contador_conn = conn
+    return _contador_conn
+
+
+# Vía rápida de facturación: una plantilla XLSX mínima con los textos como
+# cadenas inline y marcadores {{...}}, de modo que rellenarla es sustituir
+# texto e insertar las filas de items como XML ya ensamblado, sin construir
+# el modelo de objetos de openpyxl (una Cell con estilos por cada celda)
+_PLANTILLA_FACTURA = "factura_template.xlsx"
+
+_XLSX_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+
+
+def _xml_celda_texto(texto):
+    """Celda de hoja de cálculo con una cadena inline ya escapada"""
+    from xml.sax.saxutils import escape
+    return f'<c t="inlineStr"><is><t>{escape(texto)}</t></is></c>'
+
+
+def _xml_celda_numero(valor):
+    """Celda numérica de hoja de cálculo"""
+    return f'<c t="n"><v>{valor}</v></c>'
+
+
+def _escribir_plantilla_factura(ruta):
+    """
+    Crea la plantilla mínima de factura en disco si aún no existe
+
+    El XLSX generado contiene solo las partes obligatorias del paquete y una
+    única hoja con los marcadores que generar_factura_fast sustituye.
+    """
+    import zipfile
+
+    def fila(*textos):
+        return "<row>" + "".join(_xml_celda_texto(t) for t in textos) + "</row>"
+
+    def fila_total(etiqueta, marcador):
+        return (
+            "<row><c/><c/><c/>"
+            + _xml_celda_texto(etiqueta)
+            + f'<c t="n"><v>{marcador}</v></c></row>'
+        )
+
+    hoja = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<worksheet xmlns="{_XLSX_NS}"><sheetData>'
+        + fila(EMPRESA)
+        + fila(f"NIT: {NIT}")
+        + fila(DIRECCION_EMPRESA, "", "", "Factura No.", "{{NUM_FACTURA}}")
+        + fila(f"Tel: {TELEFONO_EMPRESA}", "", "", "Fecha:", "{{FECHA}}")
+        + "<row/>"
+        + fila("DATOS DEL CLIENTE")
+        + fila("Nombre:", "{{NOMBRE}}")
+        + fila("Teléfono:", "{{TELEFONO}}")
+        + fila("Dirección:", "{{DIRECCION}}")
+        + fila("Pago:", "{{PAGO}}")
+        + "<row/>"
+        + fila("DETALLE DEL PEDIDO")
+        + fila("#", "Descripción", "Cantidad", "Precio Unit.", "Total")
+        + "{{ITEMS}}"
+        + fila_total("Subtotal:", "{{SUBTOTAL}}")
+        + fila_total("Domicilio:", "{{DOMICILIO}}")
+        + fila_total("TOTAL:", "{{TOTAL}}")
+        + "<row/>"
+        + fila("¡Gracias por tu compra!")
+        + "</sheetData></worksheet>"
+    )
+
+    content_types = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    )
+    rels = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    )
+    workbook = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<workbook xmlns="{_XLSX_NS}" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Factura" sheetId="1" r:id="rId1"/></sheets></workbook>'
+    )
+    workbook_rels = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    )
+
+    with zipfile.ZipFile(ruta, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", content_types)
+        zf.writestr("_rels/.rels", rels)
+        zf.writestr("xl/workbook.xml", workbook)
+        zf.writestr("xl/_rels/workbook.xml.rels", workbook_rels)
+        zf.writestr("xl/worksheets/sheet1.xml", hoja)
+
+
+@functools.lru_cache(maxsize=1)
+def _leer_plantilla_factura(ruta):
+    """Lee la plantilla una sola vez y devuelve sus partes como bytes"""
+    import zipfile
+
+    with zipfile.ZipFile(ruta) as zf:
+        return {nombre: zf.read(nombre) for nombre in zf.namelist()}
+
+
+def _import_openpyxl():
+    """Importa openpyxl de forma diferida, la primera vez que se genera una factura"""
+    global Workbook, Font, Alignment, PatternFill, Border, Side, NamedStyle, get_column_letter, Image
+
+    if "Workbook" in globals():
+        return
+
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, Alignment, PatternFill, Border, Side, NamedStyle
+    from openpyxl.utils import get_column_letter
+
+    try:
+        from openpyxl.drawing.image import Image  # Para el logo en Excel
+    except ImportError:
+        print("Advertencia: No se pudo importar Image de openpyxl. El logo no se mostrará en las facturas.")
+        Image = None
+
+
+class FacturaExcel:
+    def __init__(self):
+        """Inicializa el generador de facturas en Excel"""
+        _import_openpyxl()
+
+        # Nota: no se usa Workbook(write_only=True) porque el modo de solo
+        # escritura no admite celdas combinadas ni acceso por coordenada
+        # (ws['A1']), de los que depende todo el diseño de la factura. Para
+        # generación en volumen está el motor xlsxwriter (EXCEL_BACKEND).
+        self.wb = Workbook()
+        self.ws = self.wb.active
+        self.ws.title = "Factura"
+        
+        # Cargar contador de facturas
+        self.contador_file = "invoice_count.json"
+        self.num_factura = self._obtener_numero_factura()
+        
+        # Estilos predefinidos
+        self.titulo_font = Font(name='Arial', size=16, bold=True)
+        self.subtitulo_font = Font(name='Arial', size=12, bold=True)
+        self.header_font = Font(name='Arial', size=11, bold=True, color="FFFFFF")
+        self.normal_font = Font(name='Arial', size=11)
+        
+        # Colores
+        self.color_principal = "FF8C00"  # Naranja para mantener la identidad de hamburguesas
+        self.color_secundario = "FFC04D"  # Naranja claro
+
+        # Relleno corporativo compartido: se crea una sola vez y se reutiliza
+        # por referencia en todas las celdas (nunca dentro de un bucle de filas)
+        self.header_fill = PatternFill(start_color=self.color_principal,
+                                       end_color=self.color_principal,
+                                       fill_type="solid")
+        
+        # Bordes
+        self.thin_border = Border(
+            left=Side(style='thin'),
+            right=Side(style='thin'),
+            top=Side(style='thin'),
+            bottom=Side(style='thin')
+        )
+
+        # Rangos de celdas por combinar, acumulados durante la construcción
+        # y aplicados de una sola vez justo antes de guardar
+        self._pending_merges = []
+
+        # Alineaciones compartidas, por la misma razón que header_fill
+        self.align_center = Alignment(horizontal='center')
+        self.align_right = Alignment(horizontal='right')
+
+        # Estilo con nombre registrado una sola vez en el libro: asignar
+        # cell.style = "header" referencia este estilo en lugar de crear y
+        # deduplicar un StyleProxy por celda al guardar
+        estilo_header = NamedStyle(name="header", font=self.header_font,
+                                   fill=self.header_fill)
+        self.wb.add_named_style(estilo_header)
+        
+    def _obtener_numero_factura(self):
+        """
+        Obtiene y actualiza el número de factura secuencial
+        """
+        today = datetime.date.today().isoformat()
+        fecha_formato = today.replace("-", "")
+
+        # Camino rápido: una sola sentencia atómica contra sqlite
+        conn = _contador_sqlite()
+        if conn is not None:
+            try:
+                with _contador_lock:
+                    fila = conn.execute(
+                        "INSERT INTO daily(date, n) VALUES(?, 1) "
+                        "ON CONFLICT(date) DO UPDATE SET n = n + 1 "
+                        "RETURNING n",
+                        (today,),
+                    ).fetchone()
+                return f"{fecha_formato}-{fila[0]:03d}"
+            except Exception as e:
+                # SQLite demasiado viejo para RETURNING, disco de solo
+                # lectura, etc.: seguir con el contador JSON de siempre
+                logger.warning("Contador sqlite no disponible, usando JSON: %s", e)
+
+        try:
+            with open(self.contador_file, "r") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = {"last_number": 0, "date": today}
+        
+        # Si es un nuevo día, reiniciar contador
+        if data.get("date") != today:
+            count = 1
+        else:
+            count = data.get("last_number", 0) + 1
+            
+        # Guardar nuevo contador
+        data["last_number"] = count
+        data["date"] = today
+        
+        with open(self.contador_file, "w") as f:
+            json.dump(data, f)
+            
+        # Formato: YYYYMMDD-NNN
+        return f"{fecha_formato}-{count:03d}"
+        
+    def _configurar_pagina(self):
+        """Configura las dimensiones y márgenes de la página"""
+        # Ajustar anchos de columna
+        self.ws.column_dimensions['A'].width = 5   # Núm ítem
+        self.ws.column_dimensions['B'].width = 40  # Descripción
+        self.ws.column_dimensions['C'].width = 12  # Cantidad
+        self.ws.column_dimensions['D'].width = 15  # Precio unitario
+        self.ws.column_dimensions['E'].width = 15  # Total
+    
+    def _crear_encabezado(self):
+        """Crea el encabezado de la factura con logo y datos de la empresa"""
+        # Intentar insertar logo si existe
+        try:
+            if Image is not None and os.path.exists(LOGO_PATH):
+                logo = Image(LOGO_PATH)
+                logo.width = 150
+                logo.height = 70
+                self.ws.add_image(logo, "A1")
+        except Exception as e:
+            logger.warning("No se pudo cargar el logo: %s", e)
+            self.ws['A1'] = EMPRESA
+            self.ws['A1'].font = Font(name='Arial', size=20, bold=True)
+        
+        # Información de la empresa - Lado izquierdo
+        self.ws['B1'] = EMPRESA
+        self.ws['B1'].font = self.titulo_font
+        
+        self.ws['B2'] = f"NIT: {NIT}"
+        self.ws['B2'].font = self.normal_font
+        
+        self.ws['B3'] = DIRECCION_EMPRESA
+        self.ws['B3'].font = self.normal_font
+        
+        self.ws['B4'] = f"Tel: {TELEFONO_EMPRESA}"
+        self.ws['B4'].font = self.normal_font
+        
+        self.ws['B5'] = f"Email: {CORREO_EMPRESA}"
+        self.ws['B5'].font = self.normal_font
+        
+        # Información de factura - Lado derecho
+        self.ws['D1'] = "FACTURA DE VENTA"
+        self.ws['D1'].font = self.titulo_font
+        self.ws['D1'].alignment = self.align_center
+        self._pending_merges.append('D1:E1')
+        
+        self.ws['D2'] = f"No. {self.num_factura}"
+        self.ws['D2'].font = self.subtitulo_font
+        self.ws['D2'].alignment = self.align_center
+        self._pending_merges.append('D2:E2')
+        
+        # Fecha de emisión
+        fecha_actual = datetime.datetime.now().strftime("%d/%m/%Y %H:%M")
+        self.ws['D3'] = "Fecha de Emisión:"
+        self.ws['D3'].font = self.normal_font
+        self.ws['D3'].alignment = self.align_right
+        
+        self.ws['E3'] = fecha_actual
+        self.ws['E3'].font = self.normal_font
+        
+        # Separador
+        for col in range(1, 6):  # A-E
+            self.ws.cell(row=7, column=col).fill = self.header_fill
+    
+    def _agregar_datos_cliente(self, datos_cliente):
+        """
+        Agrega la sección de datos del cliente
+        
+        Args:
+            datos_cliente: Diccionario con nombre, direccion, telefono
+        """
+        row = 8
+        
+        self.ws[f'A{row}'] = "DATOS DEL CLIENTE"
+        self.ws[f'A{row}'].font = self.subtitulo_font
+        self._pending_merges.append(f'A{row}:E{row}')
+        
+        row += 1
+        self.ws[f'A{row}'] = "Nombre:"
+        self.ws[f'A{row}'].style = "header"
+        
+        self.ws[f'B{row}'] = datos_cliente['nombre']
+        self.ws[f'B{row}'].font = self.normal_font
+        self._pending_merges.append(f'B{row}:E{row}')
+        
+        row += 1
+        self.ws[f'A{row}'] = "Teléfono:"
+        self.ws[f'A{row}'].style = "header"
+        
+        self.ws[f'B{row}'] = datos_cliente['telefono']
+        self.ws[f'B{row}'].font = self.normal_font
+        self._pending_merges.append(f'B{row}:E{row}')
+        
+        row += 1
+        self.ws[f'A{row}'] = "Dirección:"
+        self.ws[f'A{row}'].style = "header"
+        
+        self.ws[f'B{row}'] = datos_cliente['direccion']
+        self.ws[f'B{row}'].font = self.normal_font
+        self._pending_merges.append(f'B{row}:E{row}')
+        
+        row += 1
+        self.ws[f'A{row}'] = "Pago:"
+        self.ws[f'A{row}'].style = "header"
+        
+        self.ws[f'B{row}'] = datos_cliente['metodo_pago']
+        self.ws[f'B{row}'].font = self.normal_font
+        self._pending_merges.append(f'B{row}:E{row}')
+        
+        # Espacio
+        row += 2
+        return row
+    
+    def _crear_tabla_productos(self, row_start, items):
+        """
+        Crea la tabla de productos del pedido
+        
+        Args:
+            row_start: Fila donde inicia la tabla
+            items: Lista de diccionarios con los items del pedido
+                   [{'descripcion': '', 'cantidad': n, 'precio': n, 'total': n}, ...]
+                   
+        Returns:
+            int: Fila siguiente después de la tabla
+        """
+        # Encabezados de tabla
+        headers = ["#", "Descripción", "Cantidad", "Precio Unit.", "Total"]
+        
+        row = row_start
+        self.ws[f'A{row}'] = "DETALLE DEL PEDIDO"
+        self.ws[f'A{row}'].font = self.subtitulo_font
+        self._pending_merges.append(f'A{row}:E{row}')
+        
+        # Cabecera de tabla
+        row += 1
+        for col_idx, header in enumerate(headers, 1):
+            col_letter = get_column_letter(col_idx)
+            self.ws[f'{col_letter}{row}'] = header
+            self.ws[f'{col_letter}{row}'].style = "header"
+            self.ws[f'{col_letter}{row}'].alignment = self.align_center
+            # Borde
+            self.ws[f'{col_letter}{row}'].border = self.thin_border
+        
+        # Contenido de la tabla
+        total_general = 0
+        domicilio = 0
+        
+        for i, item in enumerate(items, 1):
+            row += 1
+            
+            # Número de ítem
+            self.ws[f'A{row}'] = i
+            self.ws[f'A{row}'].alignment = self.align_center
+            
+            # Descripción
+            self.ws[f'B{row}'] = item['descripcion']
+            
+            # Cantidad
+            self.ws[f'C{row}'] = item['cantidad']
+            self.ws[f'C{row}'].alignment = self.align_center
+            
+            # Precio unitario
+            self.ws[f'D{row}'] = item['precio']
+            self.ws[f'D{row}'].number_format = '"$"#,##0'
+            self.ws[f'D{row}'].alignment = self.align_right
+            
+            # Total
+            total_item = item['cantidad'] * item['precio']
+            self.ws[f'E{row}'] = total_item
+            self.ws[f'E{row}'].number_format = '"$"#,##0'
+            self.ws[f'E{row}'].alignment = self.align_right
+            
+            # Si es domicilio, guardarlo aparte (la marca se calculó al parsear)
+            if item.get('is_delivery'):
+                domicilio = total_item
+            else:
+                total_general += total_item
+            
+            # Bordes para toda la fila
+            for col_idx in range(1, 6):
+                col_letter = get_column_letter(col_idx)
+                self.ws[f'{col_letter}{row}'].border = self.thin_border
+                
+        # Subtotal y domicilio
+        row += 2
+        self.ws[f'D{row}'] = "Subtotal:"
+        self.ws[f'D{row}'].font = self.header_font
+        self.ws[f'D{row}'].alignment = self.align_right
+        
+        self.ws[f'E{row}'] = total_general
+        self.ws[f'E{row}'].number_format = '"$"#,##0'
+        self.ws[f'E{row}'].alignment = self.align_right
+        self.ws[f'E{row}'].font = self.normal_font
+        
+        row += 1
+        self.ws[f'D{row}'] = "Domicilio:"
+        self.ws[f'D{row}'].font = self.header_font
+        self.ws[f'D{row}'].alignment = self.align_right
+        
+        self.ws[f'E{row}'] = domicilio
+        self.ws[f'E{row}'].number_format = '"$"#,##0'
+        self.ws[f'E{row}'].alignment = self.align_right
+        self.ws[f'E{row}'].font = self.normal_font
+        
+        row += 1
+        self.ws[f'D{row}'] = "TOTAL A PAGAR:"
+        self.ws[f'D{row}'].font = self.header_font
+        self.ws[f'D{row}'].alignment = self.align_right
+        
+        self.ws[f'E{row}'] = total_general + domicilio
+        self.ws[f'E{row}'].number_format = '"$"#,##0'
+        self.ws[f'E{row}'].alignment = self.align_right
+        self.ws[f'E{row}'].font = self.subtitulo_font
+        
+        # Agregar notas o términos
+        row += 3
+        self.ws[f'A{row}'] = "NOTAS:"
+        self.ws[f'A{row}'].font = self.subtitulo_font
+        self._pending_merges.append(f'A{row}:E{row}')
+        
+        row += 1
+        self.ws[f'A{row}'] = "• Esta factura es un comprobante válido para reclamaciones y garantías."
+        self.ws[f'A{row}'].font = self.normal_font
+        self._pending_merges.append(f'A{row}:E{row}')
+        
+        row += 1
+        self.ws[f'A{row}'] = "• Cualquier inconveniente con su pedido, contáctenos al " + TELEFONO_EMPRESA
+        self.ws[f'A{row}'].font = self.normal_font
+        self._pending_merges.append(f'A{row}:E{row}')
+        
+        row += 2
+        self.ws[f'A{row}'] = "¡GRACIAS POR SU COMPRA!"
+        self.ws[f'A{row}'].font = self.subtitulo_font
+        self.ws[f'A{row}'].alignment = self.align_center
+        self._pending_merges.append(f'A{row}:E{row}')
+        
+        return row + 1
+        
+    def generar_factura(self, datos_cliente, resumen_pedido):
+        """
+        Genera una factura completa en Excel
+        
+        Args:
+            datos_cliente: Diccionario con datos del cliente
+            resumen_pedido: Texto con el resumen del pedido
+            
+        Returns:
+            str: Ruta al archivo Excel generado
+        """
+        # Extraer items del pedido desde el resumen de texto
+        items = self._extraer_items_del_resumen(resumen_pedido)
+
+        nombre_archivo = f"Factura_{self.num_factura}_{datos_cliente['nombre'].replace(' ', '_')}.xlsx"
+        ruta_archivo = os.path.join(_CWD, nombre_archivo)
+
+        if EXCEL_BACKEND == "xlsxwriter" and XLSXWRITER_DISPONIBLE:
+            # Motor rápido: escribe el XML directamente
+            self._generar_con_xlsxwriter(datos_cliente, items, ruta_archivo)
+        else:
+            # Configurar página
+            self._configurar_pagina()
+
+            # Crear encabezado
+            self._crear_encabezado()
+
+            # Agregar datos del cliente
+            row = self._agregar_datos_cliente(datos_cliente)
+
+            # Agregar tabla de productos
+            self._crear_tabla_productos(row, items)
+
+            # Aplicar todas las combinaciones de celdas de una vez
+            self._aplicar_merges()
+
+            # Guardar archivo
+            self.wb.save(ruta_archivo)
+
+        logger.info("Factura generada: %s", ruta_archivo)
+        return ruta_archivo
+
+    def generar_factura_fast(self, datos_cliente, resumen_pedido):
+        """
+        Genera la factura rellenando la plantilla XLSX en lugar de openpyxl
+
+        Lee la plantilla una sola vez por proceso (lru_cache), sustituye los
+        marcadores de texto, inserta las filas de items como XML ensamblado
+        con join y re-comprime el ZIP: mismo contenido, sin pagar un objeto
+        Cell con estilos por celda. Pensada para lotes grandes; si algo
+        falla recurre a generar_factura, que sigue siendo la vía normal.
+
+        Args:
+            datos_cliente: Diccionario con datos del cliente
+            resumen_pedido: Texto con el resumen del pedido
+
+        Returns:
+            str: Ruta al archivo Excel generado
+        """
+        import zipfile
+        from xml.sax.saxutils import escape
+
+        try:
+            items = self._extraer_items_del_resumen(resumen_pedido)
+
+            nombre_archivo = f"Factura_{self.num_factura}_{datos_cliente['nombre'].replace(' ', '_')}.xlsx"
+            ruta_archivo = os.path.join(_CWD, nombre_archivo)
+
+            if not os.path.exists(_PLANTILLA_FACTURA):
+                _escribir_plantilla_factura(_PLANTILLA_FACTURA)
+            partes = _leer_plantilla_factura(_PLANTILLA_FACTURA)
+
+            total_general = 0
+            domicilio = 0
+            filas = []
+            for i, item in enumerate(items, 1):
+                if item.get('is_delivery'):
+                    domicilio = item['total']
+                else:
+                    total_general += item['total']
+                filas.append(
+                    "<row>"
+                    + _xml_celda_numero(i)
+                    + _xml_celda_texto(item['descripcion'])
+                    + _xml_celda_numero(item['cantidad'])
+                    + _xml_celda_numero(item['precio'])
+                    + _xml_celda_numero(item['total'])
+                    + "</row>"
+                )
+
+            hoja = partes["xl/worksheets/sheet1.xml"].decode("utf-8")
+            hoja = hoja.replace("{{ITEMS}}", "".join(filas))
+            for marcador, valor in (
+                ("{{NUM_FACTURA}}", self.num_factura),
+                ("{{FECHA}}", datetime.datetime.now().strftime("%d/%m/%Y %H:%M")),
+                ("{{NOMBRE}}", datos_cliente['nombre']),
+                ("{{TELEFONO}}", datos_cliente['telefono']),
+                ("{{DIRECCION}}", datos_cliente['direccion']),
+                ("{{PAGO}}", datos_cliente['metodo_pago']),
+                ("{{SUBTOTAL}}", total_general),
+                ("{{DOMICILIO}}", domicilio),
+                ("{{TOTAL}}", total_general + domicilio),
+            ):
+                hoja = hoja.replace(marcador, escape(str(valor)))
+
+            with zipfile.ZipFile(ruta_archivo, "w", zipfile.ZIP_DEFLATED) as zf:
+                for nombre, contenido in partes.items():
+                    if nombre == "xl/worksheets/sheet1.xml":
+                        contenido = hoja.encode("utf-8")
+                    zf.writestr(nombre, contenido)
+
+            logger.info("Factura generada (vía rápida): %s", ruta_archivo)
+            return ruta_archivo
+        except Exception as e:
+            logger.warning("Vía rápida de factura no disponible (%s); usando openpyxl", e)
+            return self.generar_factura(datos_cliente, resumen_pedido)
+
+    def _aplicar_merges(self):
+        """
+        Aplica en bloque los rangos combinados acumulados en _pending_merges
+
+        Cada llamada a ws.merge_cells valida solapamientos contra toda la
+        lista de rangos ya combinados (cuadrático sobre la factura entera);
+        merged_cells.add agrega cada rango sin esa pasada y funciona tanto
+        cuando ranges es lista como cuando es set (openpyxl 3.1).
+        """
+        for rango in self._pending_merges:
+            self.ws.merged_cells.add(rango)
+        self._pending_merges.clear()
+
+    def _generar_con_xlsxwriter(self, datos_cliente, items, ruta_archivo):
+        """
+        Genera la misma factura usando xlsxwriter como motor de escritura
+
+        Args:
+            datos_cliente: Diccionario con datos del cliente
+            items: Lista de items ya extraídos del resumen
+            ruta_archivo: Ruta donde guardar el archivo Excel
+        """
+        import xlsxwriter
+
+        wb = xlsxwriter.Workbook(ruta_archivo)
+        ws = wb.add_worksheet("Factura")
+
+        # Formatos equivalentes a los estilos de openpyxl (se crean una vez)
+        color = f"#{self.color_principal}"
+        fmt_titulo = wb.add_format({'font_name': 'Arial', 'font_size': 16, 'bold': True})
+        fmt_titulo_centro = wb.add_format({'font_name': 'Arial', 'font_size': 16, 'bold': True, 'align': 'center'})
+        fmt_subtitulo = wb.add_format({'font_name': 'Arial', 'font_size': 12, 'bold': True})
+        fmt_subtitulo_centro = wb.add_format({'font_name': 'Arial', 'font_size': 12, 'bold': True, 'align': 'center'})
+        fmt_normal = wb.add_format({'font_name': 'Arial', 'font_size': 11})
+        fmt_header = wb.add_format({'font_name': 'Arial', 'font_size': 11, 'bold': True,
+                                    'font_color': '#FFFFFF', 'bg_color': color,
+                                    'align': 'center', 'border': 1})
+        fmt_etiqueta = wb.add_format({'font_name': 'Arial', 'font_size': 11, 'bold': True,
+                                      'font_color': '#FFFFFF', 'bg_color': color})
+        fmt_centro = wb.add_format({'align': 'center', 'border': 1})
+        fmt_celda = wb.add_format({'border': 1})
+        fmt_moneda = wb.add_format({'num_format': '"$"#,##0', 'align': 'right', 'border': 1})
+        fmt_total = wb.add_format({'font_name': 'Arial', 'font_size': 12, 'bold': True,
+                                   'num_format': '"$"#,##0', 'align': 'right'})
+        fmt_moneda_libre = wb.add_format({'font_name': 'Arial', 'font_size': 11,
+                                          'num_format': '"$"#,##0', 'align': 'right'})
+        fmt_etiqueta_derecha = wb.add_format({'font_name': 'Arial', 'font_size': 11, 'bold': True,
+                                              'font_color': '#FFFFFF', 'bg_color': color, 'align': 'right'})
+        fmt_relleno = wb.add_format({'bg_color': color})
+
+        # Anchos de columna (mismos que _configurar_pagina)
+        ws.set_column('A:A', 5)
+        ws.set_column('B:B', 40)
+        ws.set_column('C:C', 12)
+        ws.set_column('D:D', 15)
+        ws.set_column('E:E', 15)
+
+        # Encabezado con logo y datos de la empresa
+        if os.path.exists(LOGO_PATH):
+            ws.insert_image('A1', LOGO_PATH, {'x_scale': 0.5, 'y_scale': 0.5})
+
+        ws.write('B1', EMPRESA, fmt_titulo)
+        ws.write('B2', f"NIT: {NIT}", fmt_normal)
+        ws.write('B3', DIRECCION_EMPRESA, fmt_normal)
+        ws.write('B4', f"Tel: {TELEFONO_EMPRESA}", fmt_normal)
+        ws.write('B5', f"Email: {CORREO_EMPRESA}", fmt_normal)
+
+        ws.merge_range('D1:E1', "FACTURA DE VENTA", fmt_titulo_centro)
+        ws.merge_range('D2:E2', f"No. {self.num_factura}", fmt_subtitulo_centro)
+        ws.write('D3', "Fecha de Emisión:", fmt_normal)
+        ws.write('E3', datetime.datetime.now().strftime("%d/%m/%Y %H:%M"), fmt_normal)
+
+        # Separador (fila 7 de openpyxl -> índice 6)
+        for col in range(5):
+            ws.write_blank(6, col, None, fmt_relleno)
+
+        # Datos del cliente
+        ws.merge_range('A8:E8', "DATOS DEL CLIENTE", fmt_subtitulo)
+        campos = [
+            ("Nombre:", datos_cliente['nombre']),
+            ("Teléfono:", datos_cliente['telefono']),
+            ("Dirección:", datos_cliente['direccion']),
+            ("Pago:", datos_cliente['metodo_pago']),
+        ]
+        row = 8  # Índice base 0 (fila 9 en Excel)
+        for etiqueta, valor in campos:
+            ws.write(row, 0, etiqueta, fmt_etiqueta)
+            ws.merge_range(row, 1, row, 4, valor, fmt_normal)
+            row += 1
+
+        # Tabla de productos
+        row += 1
+        ws.merge_range(row, 0, row, 4, "DETALLE DEL PEDIDO", fmt_subtitulo)
+        row += 1
+        for col, header in enumerate(["#", "Descripción", "Cantidad", "Precio Unit.", "Total"]):
+            ws.write(row, col, header, fmt_header)
+
+        total_general = 0
+        domicilio = 0
+        for i, item in enumerate(items, 1):
+            row += 1
+            total_item = item['cantidad'] * item['precio']
+            ws.write(row, 0, i, fmt_centro)
+            ws.write(row, 1, item['descripcion'], fmt_celda)
+            ws.write(row, 2, item['cantidad'], fmt_centro)
+            ws.write(row, 3, item['precio'], fmt_moneda)
+            ws.write(row, 4, total_item, fmt_moneda)
+
+            if item.get('is_delivery'):
+                domicilio = total_item
+            else:
+                total_general += total_item
+
+        # Totales
+        row += 2
+        ws.write(row, 3, "Subtotal:", fmt_etiqueta_derecha)
+        ws.write(row, 4, total_general, fmt_moneda_libre)
+        row += 1
+        ws.write(row, 3, "Domicilio:", fmt_etiqueta_derecha)
+        ws.write(row, 4, domicilio, fmt_moneda_libre)
+        row += 1
+        ws.write(row, 3, "TOTAL A PAGAR:", fmt_etiqueta_derecha)
+        ws.write(row, 4, total_general + domicilio, fmt_total)
+
+        # Notas
+        row += 3
+        ws.merge_range(row, 0, row, 4, "NOTAS:", fmt_subtitulo)
+        row += 1
+        ws.merge_range(row, 0, row, 4,
+                       "• Esta factura es un comprobante válido para reclamaciones y garantías.",
+                       fmt_normal)
+        row += 1
+        ws.merge_range(row, 0, row, 4,
+                       "• Cualquier inconveniente con su pedido, contáctenos al " + TELEFONO_EMPRESA,
+                       fmt_normal)
+        row += 2
+        ws.merge_range(row, 0, row, 4, "¡GRACIAS POR SU COMPRA!", fmt_subtitulo_centro)
+
+        wb.close()
+        
+    def _extraer_items_del_resumen(self, resumen_pedido):
+        """
+        Extrae los items y precios del resumen textual del pedido
+        
+        Args:
+            resumen_pedido: Texto con el resumen del pedido, o lista de
+                líneas ya separadas (evita repetir el split en el llamador)
+            
+        Returns:
+            list: Lista de diccionarios con detalles de items
+        """
+        items = []
+        
+        # Dividir por líneas y buscar patrones de items y precios
+        if isinstance(resumen_pedido, str):
+            lineas = resumen_pedido.strip().split('\n')
+        else:
+            lineas = resumen_pedido
+        
+        for linea in lineas:
+            # Quitar espacios y viñetas para que el patrón anclado cubra la
+            # línea completa (con fullmatch un fallo termina en un intento,
+            # en lugar de reintentar la búsqueda desde cada posición)
+            linea = linea.strip().lstrip('•*- \t')
+            if not linea:
+                continue
+
+            # Descarte rápido: un translate en C deja solo los caracteres
+            # "de dinero" de la línea; los tres patrones exigen el guion
+            # separador y al menos un dígito de precio, así que las líneas
+            # narrativas se descartan sin lanzar el motor de regex
+            resto = linea.translate(_MONEY_BITMAP)
+            if '-' not in resto or not resto.strip('$-'):
+                continue
+
+            # Una sola pasada sobre la línea prueba los tres patrones a la vez
+            coincidencia = _PATRON_ITEM.fullmatch(linea)
+            if not coincidencia:
+                continue
+
+            if coincidencia.group('p1_qty') is not None:
+                # Patrón 1: "X Item - $Precio"
+                cantidad = int(coincidencia.group('p1_qty'))
+                descripcion = coincidencia.group('p1_desc').strip()
+                precio_total = float(coincidencia.group('p1_price').replace(',', ''))
+                precio_unitario = precio_total / cantidad
+                
+                items.append((descripcion, cantidad, precio_unitario,
+                              precio_total, bool(_DELIVERY_RE.search(descripcion))))
+            elif coincidencia.group('p2_qty') is not None:
+                # Patrón 2: "Item (xX) - $Precio"
+                descripcion = coincidencia.group('p2_desc').strip()
+                cantidad = int(coincidencia.group('p2_qty'))
+                precio_total = float(coincidencia.group('p2_price').replace(',', ''))
+                precio_unitario = precio_total / cantidad
+                
+                items.append((descripcion, cantidad, precio_unitario,
+                              precio_total, bool(_DELIVERY_RE.search(descripcion))))
+            else:
+                # Patrón 3: "Item - $Precio" (cantidad 1 implícita)
+                descripcion = coincidencia.group('p3_desc').strip()
+                precio = float(coincidencia.group('p3_price').replace(',', ''))
+                
+                # Si contiene "domicilio" o términos similares
+                if _DELIVERY_RE.search(descripcion):
+                    items.append(("Domicilio", 1, precio, precio, True))
+                else:
+                    items.append((descripcion, 1, precio, precio, False))
+        
+        # Si no se identificaron items, crear uno genérico
+        if not items:
+            items.append(("Pedido completo (ver detalle en resumen)",
+                          1, 0, 0, False))  # Precio desconocido
+        
+        # Materializar los diccionarios de una sola vez
+        return [dict(zip(_ITEM_KEYS, item)) for item in items]
+
+def generar_y_enviar_factura(datos_cliente, resumen_pedido, server=None):
+    """
+    Genera una factura Excel y la envía por correo
+    
+    Args:
+        datos_cliente: Diccionario con datos del cliente
+        resumen_pedido: Texto del resumen del pedido
+        server: Sesión SMTP ya autenticada a reutilizar (opcional)
+        
+    Returns:
+        tuple: (éxito_generación, éxito_envío, ruta_factura)
+    """
+    try:
+        # Crear generador de facturas
+        factura_gen = FacturaExcel()
+        
+        # Generar factura
+        ruta_factura = factura_gen.generar_factura(datos_cliente, resumen_pedido)
+        
+        # Enviar por correo
+        enviado = enviar_factura_por_correo(ruta_factura, datos_cliente, resumen_pedido, server=server)
+        
+        return True, enviado, ruta_factura
+    
+    except Exception as e:
+        logger.error("Error al generar/enviar factura: %s", e)
+        return False, False, None
+
+# Configuración SMTP compartida por todos los envíos de correo
+_SMTP_SERVER = "smtp.gmail.com"
+_SMTP_PORT = 587  # TLS
+_SMTP_USER = "apeironiafilo@gmail.com"
+_SMTP_PASSWORD = "nuhk ijhw szaf rgut"  # Contraseña de aplicación
+
+
+class SMTPSession:
+    """
+    Sesión SMTP reutilizable entre varios envíos de correo
+
+    Abrir la conexión, negociar STARTTLS y autenticarse cuestan varios
+    viajes de red; cuando se envían el resumen y la factura seguidos
+    (opciones 5 y 6) la misma sesión sirve para ambos correos en lugar de
+    pagar dos handshakes TLS y dos AUTH contra el mismo relay.
+    """
+
+    def __init__(self, server=_SMTP_SERVER, port=_SMTP_PORT,
+                 user=_SMTP_USER, password=_SMTP_PASSWORD):
+        self.server = server
+        self.port = port
+        self.user = user
+        self.password = password
+        self._conn = None
+
+    def __enter__(self):
+        import smtplib
+
+        self._conn = smtplib.SMTP(self.server, self.port)
+        self._conn.starttls()
+        self._conn.login(self.user, self.password)
+        return self._conn
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            self._conn.quit()
+        except Exception:
+            pass
+        return False
+
+
+# Cuerpos HTML de los correos: la parte fija se construye una sola vez al
+# importar (método format ya ligado, como _MSG_TPL) y cada envío solo
+# sustituye los campos dinámicos
+_CORREO_FACTURA_TPL = """
+        <html>
+          <body style="font-family: Arial, sans-serif;">
+            <div style="max-width: 600px; margin: 0 auto; padding: 20px; border: 1px solid #ddd; border-radius: 5px;">
+              <div style="text-align: center; margin-bottom: 20px;">
+                <h1 style="color: #FF8C00;">🧾 Factura - Samir's Burgers</h1>
+              </div>
+              
+              <p>Estimado cliente,</p>
+              
+              <p>Adjunto encontrará la <strong>factura electrónica</strong> correspondiente a su pedido en Samir's Burgers.</p>
+              
+              <div style="background-color: #f9f9f9; padding: 15px; border-radius: 5px; margin: 15px 0;">
+                <h3 style="margin-top: 0; color: #FF8C00;">Resumen del Pedido:</h3>
+                <p style="white-space: pre-line;">{resumen_pedido}</p>
+              </div>
+              
+              <p>La factura adjunta es un documento válido para efectos fiscales y garantías de servicio.</p>
+              
+              <p>Si tiene alguna pregunta o inquietud, no dude en contactarnos al {telefono_empresa}.</p>
+              
+              <div style="margin-top: 30px; padding-top: 20px; border-top: 1px solid #ddd; text-align: center; color: #777;">
+                <p>¡Gracias por su preferencia!</p>
+                <p>Samir's Burgers - Sabor que enamora</p>
+                <p>{direccion_empresa}</p>
+              </div>
+            </div>
+          </body>
+        </html>
+        """.format
+
+_CORREO_PEDIDO_TPL = """
+    <html>
+      <body style="font-family: Arial, sans-serif;">
+        <hr>
+        <h2 style="text-align: center;">🍔 PEDIDO FINAL - Samir's Burgers 🍔</h2>
+        <h3 style="text-align: center;">Pedido #{count}</h3>
+        <hr>
+        <h3>👨‍🍳 Pedido:</h3>
+        {bullet_pedido}
+        <hr>
+        <h3>📞 Información del Cliente:</h3>
+        <ul>
+          <li><strong>Nombre:</strong> {nombre}</li>
+          <li><strong>Teléfono:</strong> {telefono}</li>
+          <li><strong>Dirección de entrega:</strong> {direccion}</li>
+          <li><strong>Método de pago:</strong> {metodo_pago}</li>
+        </ul>
+        <hr>
+        <h3>📝 Notas para el Coordinador:</h3>
+        <p>Verificar la exactitud del pedido y confirmar la preparación.</p>
+        <h3>🚗 Notas para el Domiciliario:</h3>
+        <p>Entregar el pedido a la dirección indicada y contactar al cliente al llegar.</p>
+        <h3>💰 Notas para el Contable:</h3>
+        <p>Registrar el total a pagar y facturar el pedido.</p>
+        <hr>
+        <p style="text-align: center;">¡Gracias por tu preferencia! 🎉</p>
+      </body>
+    </html>
+    """.format
+
+
+def enviar_factura_por_correo(ruta_factura, datos_cliente, resumen_pedido, server=None):
+    """
+    Envía la factura por correo electrónico
+    
+    Args:
+        ruta_factura: Ruta al archivo Excel de la factura
+        datos_cliente: Diccionario con datos del cliente
+        resumen_pedido: Texto con el resumen del pedido
+        server: Sesión SMTP ya autenticada a reutilizar (opcional)
+        
+    Returns:
+        bool: True si se envió correctamente
+    """
+    # Destinatarios
+    to_email = "samirosorio21@gmail.com , josedanielorregor@gmail.com , haidyflorez98@gmail.com , ab4962267@gmail.com "  # Usar los mismos del código original
+    
+    try:
+        from email.message import EmailMessage
+
+        # Crear mensaje (EmailMessage codifica el adjunto al serializar, sin
+        # mantener en memoria la copia base64 que creaba encode_base64)
+        mensaje = EmailMessage()
+        mensaje['From'] = f"Samir's Burgers <{_SMTP_USER}>"
+        mensaje['To'] = to_email
+        mensaje['Subject'] = f"🧾 Factura - Samir's Burgers - Pedido {os.path.basename(ruta_factura).split('_')[1]}"
+        
+        # Cuerpo HTML del correo (solo se rellenan los campos dinámicos)
+        html = _CORREO_FACTURA_TPL(
+            resumen_pedido=resumen_pedido,
+            telefono_empresa=TELEFONO_EMPRESA,
+            direccion_empresa=DIRECCION_EMPRESA,
+        )
+        mensaje.set_content(html, subtype="html")
+        
+        # Adjuntar factura con su tipo MIME real
+        with open(ruta_factura, "rb") as archivo:
+            mensaje.add_attachment(
+                archivo.read(),
+                maintype="application",
+                subtype="vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                filename=os.path.basename(ruta_factura),
+            )
+        
+        # Enviar correo (reutilizando la sesión si nos la pasaron)
+        if server is not None:
+            server.send_message(mensaje)
+        else:
+            with SMTPSession() as sesion:
+                sesion.send_message(mensaje)
+
+        logger.info("Factura enviada exitosamente por correo a %s", to_email)
+        return True
+    
+    except Exception as e:
+        logger.error("Error al enviar factura por correo: %s", e)
+        return False
+
+###############################
+# PARTE 3: FUNCIONES PRINCIPALES DEL CHATBOT
+###############################
+
+# Caché en memoria del contador de pedidos: el archivo se lee una sola vez
+# por proceso y después cada pedido es un incremento + escritura (write-through)
+_order_count_lock = threading.Lock()
+_order_count_cache = None
+
+def actualizar_contador_pedidos():
+    """
+    Actualiza y retorna el número de pedido para el día actual.
+    Se almacena en un archivo 'order_count.json' que contiene un diccionario
+    con la fecha (YYYY-MM-DD) como clave y el contador como valor.
+    El diccionario se cachea en memoria (protegido por lock) para no releer
+    y reparsear el JSON en cada pedido, y al actualizar se descartan las
+    fechas con más de 30 días para que el archivo no crezca sin límite.
+    """
+    global _order_count_cache
+    contador_file = "order_count.json"
+    hoy = datetime.date.today()
+    today = hoy.isoformat()
+    limite = (hoy - datetime.timedelta(days=30)).isoformat()
+    with _order_count_lock:
+        if _order_count_cache is None:
+            try:
+                with open(contador_file, "r") as f:
+                    _order_count_cache = json.load(f)
+            except FileNotFoundError:
+                _order_count_cache = {}
+        data = _order_count_cache
+        count = data.get(today, 0) + 1
+        data[today] = count
+        for fecha in [k for k in data if k < limite]:
+            del data[fecha]
+        # Escritura compacta y atómica: si el proceso muere a mitad de la
+        # escritura, el rename deja el archivo anterior intacto
+        tmp = contador_file + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp, contador_file)
+    return count
+
+def obtener_respuesta(conversacion):
+    """Envía la conversación a OpenAI y retorna la respuesta."""
+    try:
+        response = openai.ChatCompletion.create(
+            model="gpt-4o",  # Usa un modelo válido
+            messages=conversacion,
+            max_tokens=1000
+        )
+        return response.choices[0].message.content.strip()
+    except Exception as e:
+        print("Error al obtener respuesta de OpenAI:", e)
+        return "😕 Lo siento, ha ocurrido un error."
+
+def generar_resumen_pedido(conversacion, datos_cliente):
+    """
+    Genera un resumen completo del pedido combinando la conversación y los datos del cliente.
+    """
+    prompt = (
+        "A partir de la siguiente conversación, genera un resumen completo del pedido, "
+        "incluyendo todos los ítems, combos, promociones y detalles de domicilio. "
+        "Asegúrate de incluir las cantidades exactas y los precios de cada ítem. "
+        "El formato debe ser: X [nombre del producto] - $[precio]. "
+        "Luego, añade la siguiente información del cliente:\n\n"
+    )
+    prompt += (
+        f"Nombre: {datos_cliente['nombre']}\n"
+        f"Teléfono: {datos_cliente['telefono']}\n"
+        f"Dirección: {datos_cliente['direccion']}\n"
+        f"Método de pago: {datos_cliente['metodo_pago']}\n\n"
+    )
+    prompt += "Conversación:\n"
+    for msg in conversacion:
+        prompt += f"{msg['role']}: {msg['content']}\n"
+    prompt += "\nResumen del pedido:"
+    
+    try:
+        resumen_response = openai.ChatCompletion.create(
+            model="gpt-4o",
+            messages=[
+                {"role": "system", "content": "Eres un asistente que resume pedidos de un restaurante de forma clara y detallada. Asegúrate de especificar las cantidades y los precios de cada ítem."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=500
+        )
+        resumen = resumen_response.choices[0].message.content.strip()
+        return resumen
+    except Exception as e:
+        print("Error al generar el resumen del pedido:", e)
+        return "❌ Error al generar el resumen del pedido."
+
+def formatear_pedido_en_bullets(pedido):
+    """
+    Toma la cadena 'pedido' y la convierte en una lista HTML con viñetas.
+    Se asume que cada ítem está separado por saltos de línea. También
+    acepta una lista de líneas ya separadas, para que un llamador que ya
+    hizo el splitlines() no pague un segundo recorrido del texto.
+    """
+    lineas = pedido.splitlines() if isinstance(pedido, str) else pedido
+    items = (linea.strip() for linea in lineas)
+    return "<ul>" + "".join(f"<li>{item}</li>" for item in items if item) + "</ul>"
+
+def enviar_pedido_por_correo(pedido, datos_cliente, server=None):
+    """
+    Envía el resumen del pedido por correo electrónico con formato HTML y un asunto
+    que incluye el número del pedido (contador diario).
+    Se organiza en secciones para el coordinador, domiciliario y contable.
+    Si se recibe una sesión SMTP ya autenticada en `server`, se reutiliza.
+    """
+    # Actualizar el contador y obtener el número de pedido del día
+    count = actualizar_contador_pedidos()
+    
+    # Formatear el contenido del pedido en bullets
+    bullet_pedido = formatear_pedido_en_bullets(pedido)
+    
+    cuerpo = _CORREO_PEDIDO_TPL(
+        count=count,
+        bullet_pedido=bullet_pedido,
+        nombre=datos_cliente['nombre'],
+        telefono=datos_cliente['telefono'],
+        direccion=datos_cliente['direccion'],
+        metodo_pago=datos_cliente['metodo_pago'],
+    )
+    from email.mime.text import MIMEText
+
+    msg = MIMEText(cuerpo, "html", "utf-8")
+    msg['Subject'] = f"🍔 Pedido Final - Samir's Burgers - Pedido #{count} 🍔"
+    msg['From'] = _SMTP_USER       # Tu correo de envío
+    msg['To'] = "jmct_74@gmail.com, danielalvarezmoncada527@gmail.com"             # Correo de destino
+
+    try:
+        if server is not None:
+            print("[DEBUG] Reutilizando sesión SMTP abierta...")
+            server.send_message(msg)
+        else:
+            print("[DEBUG] Conectando al servidor SMTP...")
+            with SMTPSession() as sesion:
+                print("[DEBUG] Enviando correo...")
+                sesion.send_message(msg)
+        print("✅ Pedido enviado exitosamente por correo.")
+        return True
+    except Exception as e:
+        print("❌ Error al enviar el correo:", e)
+        return False
+
+# Menú de envío: texto y conjunto de opciones construidos una sola vez al
+# importar, en lugar de rehacer la lista y las llamadas a print por pedido
+_OPCIONES_VALIDAS = frozenset('1234567')
+_MENU_ENVIO = """
+📱 OPCIONES DE ENVÍO DEL PEDIDO:
+1. Enviar resumen por correo (formato HTML)
+2. Enviar factura Excel por correo
+3. Enviar confirmación por WhatsApp (mensaje)
+4. Enviar confirmación por WhatsApp (enlace directo/QR)
+5. Enviar todas las opciones de correo (1 y 2)
+6. Enviar TODAS las opciones anteriores (completo)
+7. Finalizar sin enviar"""
+
+def procesar_opciones_envio(datos_cliente, resumen_pedido):
+    """
+    Procesa las opciones de envío del pedido: correo HTML, factura Excel y WhatsApp
+
+    Args:
+        datos_cliente: Diccionario con los datos del cliente
+        resumen_pedido: Texto con el resumen del pedido
+    """
+    opciones_seleccionadas = []
+
+    while True:
+        print(_MENU_ENVIO)
+
+        seleccion = input("\nSelecciona una opción (1-7): ").strip()
+
+        if seleccion not in _OPCIONES_VALIDAS:
+            print("❌ Opción no válida. Intenta nuevamente.")
+            continue
+        
+        # Salir del bucle si la opción es válida
+        opciones_seleccionadas.append(seleccion)
+        break
+    
+    resultados = {
+        'email_html': False,
+        'email_excel': False,
+        'whatsapp': False,
+        'whatsapp_direct': False,
+        'whatsapp_file': False
+    }
+    
+    # Estado compartido entre manejadores: la factura se genera una sola vez
+    # y su ruta queda cacheada para quien la necesite después (WhatsApp)
+    estado = {'ruta_factura': None, 'exito_gen_factura': False}
+
+    def _enviar_html(sesion=None):
+        print("\n📧 Enviando resumen por correo (HTML)...")
+        resultados['email_html'] = enviar_pedido_por_correo(resumen_pedido, datos_cliente, server=sesion)
+
+    def _enviar_excel(sesion=None):
+        print("\n📊 Generando y enviando factura Excel...")
+        exito_gen, exito_envio, ruta = generar_y_enviar_factura(datos_cliente, resumen_pedido, server=sesion)
+        estado['exito_gen_factura'] = exito_gen
+        estado['ruta_factura'] = ruta
+        resultados['email_excel'] = exito_envio
+
+    def _enviar_whatsapp(preguntar_factura=True):
+        print("\n📱 Enviando mensaje por WhatsApp (Selenium)...")
+        resultados['whatsapp'] = enviar_pedido_por_whatsapp(datos_cliente['telefono'], resumen_pedido, datos_cliente)
+
+        # Si ya hay factura generada, ofrecerla (o adjuntarla directamente
+        # en el envío completo, sin preguntar)
+        if estado['exito_gen_factura'] and estado['ruta_factura']:
+            if preguntar_factura:
+                enviar_factura = input("\n¿Deseas enviar también la factura Excel por WhatsApp? (s/n): ").strip().lower()
+                if not enviar_factura.startswith('s'):
+                    return
+            print("\n📎 Enviando factura Excel por WhatsApp...")
+            resultados['whatsapp_file'] = enviar_factura_por_whatsapp(
+                datos_cliente['telefono'],
+                estado['ruta_factura'],
+                datos_cliente,
+                resumen_pedido
+            )
+
+    def _enviar_whatsapp_directo():
+        print("\n🔗 Generando enlace y QR para WhatsApp directo...")
+        try:
+            if QR_DISPONIBLE:
+                enviar_pedido_whatsapp_directo(
+                    datos_cliente['telefono'],
+                    resumen_pedido,
+                    datos_cliente
+                )
+                resultados['whatsapp_direct'] = True
+            else:
+                print("Para generar QR, instala: pip install qrcode[pil]")
+                enlace = crear_enlace_whatsapp(datos_cliente['telefono'], mensaje_whatsapp(datos_cliente, resumen_pedido))
+                print(f"Enlace directo: {enlace}")
+                resultados['whatsapp_direct'] = False
+        except Exception as e:
+            print(f"❌ Error al generar enlace de WhatsApp: {e}")
+            resultados['whatsapp_direct'] = False
+
+    # Tabla de despacho: las opciones compuestas 5 y 6 se expanden sobre las
+    # simples en lugar de duplicar cada rama en un if/elif
+    manejadores = {
+        '1': _enviar_html,
+        '2': _enviar_excel,
+        '3': _enviar_whatsapp,
+        '4': _enviar_whatsapp_directo,
+    }
+    opciones_compuestas = {'5': {'1', '2'}, '6': {'1', '2', '3', '4'}}
+
+    opciones_expandidas = set()
+    for opcion in opciones_seleccionadas:
+        opciones_expandidas |= opciones_compuestas.get(opcion, {opcion})
+
+    if '6' in opciones_seleccionadas:
+        print("\n🚀 Procesando TODOS los métodos de envío...")
+    elif '5' in opciones_seleccionadas:
+        print("\n🚀 Procesando métodos de envío por correo...")
+
+    # Los dos correos comparten una sola sesión SMTP cuando van juntos
+    correos_pendientes = opciones_expandidas & {'1', '2'}
+    if len(correos_pendientes) == 2:
+        try:
+            with SMTPSession() as sesion:
+                _enviar_html(sesion)
+                _enviar_excel(sesion)
+        except Exception as e:
+            logger.warning("Sesión SMTP compartida no disponible (%s); envío individual", e)
+            _enviar_html()
+            _enviar_excel()
+        opciones_expandidas -= {'1', '2'}
+
+    # En el envío completo la factura va por WhatsApp sin preguntar
+    preguntar_factura = '6' not in opciones_seleccionadas
+
+    for opcion in sorted(opciones_expandidas):
+        if opcion == '3':
+            manejadores[opcion](preguntar_factura)
+        elif opcion in manejadores:
+            manejadores[opcion]()
+
+    # Mostrar resumen de resultados
+    print("\n📋 RESUMEN DE ENVÍOS:")
+    if resultados['email_html']:
+        print("✅ Resumen HTML enviado correctamente por correo")
+    else:
+        print("❌ No se envió el resumen HTML por correo")
+        
+    if resultados['email_excel']:
+        print("✅ Factura Excel enviada correctamente por correo")
+    else:
+        print("❌ No se envió la factura Excel por correo")
+        
+    if resultados['whatsapp']:
+        print("✅ Mensaje enviado correctamente por WhatsApp (Selenium)")
+    else:
+        if '3' in opciones_seleccionadas or '6' in opciones_seleccionadas:
+            print("❌ No se pudo enviar mensaje por WhatsApp usando Selenium")
+    
+    if resultados['whatsapp_file']:
+        print("✅ Factura Excel enviada correctamente por WhatsApp")
+    else:
+        if resultados['whatsapp'] and (estado['exito_gen_factura'] and estado['ruta_factura']):
+            print("❌ No se pudo enviar la factura por WhatsApp")
+        
+    if resultados['whatsapp_direct']:
+        print("✅ Enlace y código QR para WhatsApp generados correctamente")
+    
+    return any(resultados.values())
+
+def test_whatsapp_direct():
+    """Función de prueba para enviar WhatsApp directamente a un número específico"""
+    numero = "3042535003"  # Tu número
+    print(f"\n=== PRUEBA DE WHATSAPP PARA NÚMERO {numero} ===\n")
+    
+    mensaje = (
+        f"🍔 *PRUEBA DE SAMIR'S BURGERS* 🍔\n\n"
+        f"Este es un mensaje de prueba enviado desde el sistema de Samir's Burgers.\n\n"
+        f"Si estás recibiendo esto, ¡la configuración está funcionando correctamente!\n\n"
+        f"Hora del envío: {datetime.datetime.now().strftime('%H:%M:%S')}"
+    )
+    
+    print("Generando enlace directo y QR para WhatsApp...")
+    
+    try:
+        if QR_DISPONIBLE:
+            resultado = enviar_pedido_whatsapp_directo(numero, mensaje, {"nombre": "Cliente de prueba", "direccion": "Dirección de prueba", "metodo_pago": "Efectivo"})
+            return resultado['browser_opened']
+        else:
+            print("Para generar QR, instala: pip install qrcode[pil]")
+            enlace = crear_enlace_whatsapp(numero, mensaje)
+            print(f"Enlace directo: {enlace}")
+            return abrir_chat_directo(numero, mensaje)
+    except Exception as e:
+        print(f"Error en prueba de WhatsApp: {e}")
+        return False
+
+def main():
+    """
+    Flujo del chatbot:
+      1. El usuario conversa con el asistente y realiza su pedido.
+      2. Al escribir "confirmar", se finaliza el pedido.
+      3. Se solicitan de forma individual los datos de contacto del cliente.
+      4. Se genera y muestra el resumen final del pedido.
+      5. Se presentan opciones de envío: correo HTML, factura Excel y WhatsApp.
+    """
+    conversacion = [
+        {
+            "role": "system",
+            "content": (
+                "Eres un asistente de Samir's Burgers en Medellín. "
+                "Nuestro menú incluye: Hamburguesa Clásica (6000), Hamburguesa Doble (8000), Papas Fritas (3000). "
+                "El domicilio cuesta 2000, pero es gratis en pedidos mayores a 15000. "
+                "No solicites aún la dirección, nombre, teléfono y método de pago; se agregarán al finalizar el pedido, "
+                "cuando el usuario escriba 'confirmar'. Luego, se mostrará el resumen final y las opciones de envío."
+            )
+        },
+        {
+            "role": "user",
+            "content": "¿Qué precios, combos y promociones tienes?"
+        }
+    ]
+    
+    print("\n" + "="*60)
+    print("🍔 Bienvenido a 'Samir's Burgers' 🍔")
+    print("="*60 + "\n")
+    print("¿En qué puedo ayudarte hoy?")
+    print("¿Qué precios, combos y promociones tienes?")
+    print("¿Qué deseas ordenar hoy?\n")
+    
+    # Bucle de conversación de pedido
+    while True:
+        user_input = input("Usuario: ")
+        user_input_norm = user_input.strip().lower()
+        
+        if user_input_norm == "confirmar":
+            print("\n✅ Has finalizado tu pedido correctamente.")
+            break
+        
+        if user_input_norm == "salir" or user_input_norm == "exit":
+            print("\n👋 Gracias por visitarnos. ¡Hasta pronto!")
+            sys.exit()
+        
+        if user_input_norm == "enviar":
+            print("⚠️ No se puede enviar aún. Primero debes confirmar tu pedido escribiendo 'confirmar'.")
+            continue
+        
+        conversacion.append({"role": "user", "content": user_input})
+        respuesta = obtener_respuesta(conversacion)
+        conversacion.append({"role": "assistant", "content": respuesta})
+        print(f"Asistente: {respuesta}\n")
+    
+    # Solicitar datos de contacto de forma individual
+    print("\n📋 Para completar tu pedido, por favor responde lo siguiente:")
+    direccion = input("¿Cuál es la dirección de entrega? ")
+    nombre_cliente = input("¿Cuál es tu nombre? ")
+    telefono = input("¿Cuál es tu número de teléfono? ")
+    
+    # Opciones de método de pago
+    print("\n💰 Selecciona tu método de pago:")
+    print("1. Efectivo")
+    print("2. Transferencia/Nequi")
+    print("3. Tarjeta de crédito/débito (al recibir)")
+    
+    metodo_pago = ""
+    while not metodo_pago:
+        opcion = input("Ingresa el número de tu método de pago (1-3): ").strip()
+        if opcion == "1":
+            metodo_pago = "Efectivo"
+        elif opcion == "2":
+            metodo_pago = "Transferencia/Nequi"
+        elif opcion == "3":
+            metodo_pago = "Tarjeta (al recibir)"
+        else:
+            print("❌ Opción no válida. Intenta nuevamente.")
+    
+    # Datos del cliente
+    datos_cliente = {
+        "direccion": direccion,
+        "nombre": nombre_cliente,
+        "telefono": telefono,
+        "metodo_pago": metodo_pago
+    }
+    
+    # Generar resumen del pedido. La llamada a OpenAI es puro I/O de red,
+    # así que mientras el resumen viaja aprovechamos para calentar la
+    # maquinaria de facturación (importar openpyxl y cachear la plantilla),
+    # que de otro modo pagaríamos después, en serie, al generar la factura
+    print("\n⏳ Generando resumen del pedido...")
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future_resumen = executor.submit(generar_resumen_pedido, conversacion, datos_cliente)
+        try:
+            _import_openpyxl()
+            if not os.path.exists(_PLANTILLA_FACTURA):
+                _escribir_plantilla_factura(_PLANTILLA_FACTURA)
+            _leer_plantilla_factura(_PLANTILLA_FACTURA)
+        except Exception:
+            pass  # Sin openpyxl/plantilla se avisará al generar la factura
+        resumen_pedido = future_resumen.result()
+
+    # Mostrar resumen final
+    print("\n" + "="*60)
+    print("📝 RESUMEN DE TU PEDIDO:")
+    print("="*60)
+    print(resumen_pedido)
+    print("="*60)
+    
+    # Procesar opciones de envío
+    procesar_opciones_envio(datos_cliente, resumen_pedido)
+    
+    print("\n🎉 ¡Pedido completado con éxito! 🎉")
+    print("Gracias por ordenar en Samir's Burgers. ¡Buen provecho!")
+
+def test_mode():
+    """Modo de prueba para probar componentes individuales"""
+    print("\n" + "="*60)
+    print("🧪 MODO DE PRUEBA - Samir's Burgers 🧪")
+    print("="*60 + "\n")
+    
+    print("Selecciona una opción de prueba:")
+    print("1. Probar envío de mensaje WhatsApp (Selenium)")
+    print("2. Probar WhatsApp directo (enlace/QR)")
+    print("3. Probar generación de factura Excel")
+    print("4. Probar envío de correo")
+    print("5. Salir")
+    
+    opcion = input("\nIngresa el número de opción: ").strip()
+    
+    if opcion == "1":
+        # Probar WhatsApp con Selenium
+        numero = input("Ingresa un número de teléfono para la prueba: ")
+        mensaje = "🍔 Este es un mensaje de prueba desde Samir's Burgers"
+        print(f"Enviando mensaje de prueba a {numero}...")
+        
+        bot = WhatsAppBot()
+        if bot.start():
+            result = bot.send_message(numero, mensaje)
+            bot.close()
+            
+            if result:
+                print("✅ Mensaje enviado correctamente")
+            else:
+                print("❌ No se pudo enviar el mensaje")
+        else:
+            print("❌ No se pudo iniciar WhatsApp Web")
+            
+    elif opcion == "2":
+        # Probar WhatsApp directo
+        test_whatsapp_direct()
+        
+    elif opcion == "3":
+        # Probar generación de factura
+        datos_prueba = {
+            "nombre": "Cliente de Prueba",
+            "telefono": "3001234567",
+            "direccion": "Calle de Prueba #123",
+            "metodo_pago": "Efectivo"
+        }
+        
+        resumen_prueba = (
+            "1 Hamburguesa Clásica - $6000\n"
+            "1 Papas Fritas - $3000\n"
+            "1 Gaseosa - $2000\n"
+            "Domicilio - $2000"
+        )
+        
+        factura_gen = FacturaExcel()
+        ruta = factura_gen.generar_factura(datos_prueba, resumen_prueba)
+        
+        print(f"✅ Factura generada correctamente: {ruta}")
+        
+    elif opcion == "4":
+        # Probar envío de correo
+        datos_prueba = {
+            "nombre": "Cliente de Prueba",
+            "telefono": "3001234567",
+            "direccion": "Calle de Prueba #123",
+            "metodo_pago": "Efectivo"
+        }
+        
+        resumen_prueba = (
+            "1 Hamburguesa Clásica - $6000\n"
+            "1 Papas Fritas - $3000\n"
+            "1 Gaseosa - $2000\n"
+            "Domicilio - $2000"
+        )
+        
+        resultado = enviar_pedido_por_correo(resumen_prueba, datos_prueba)
+        
+        if resultado:
+            print("✅ Correo enviado correctamente")
+        else:
+            print("❌ No se pudo enviar el correo")
+            
+    elif opcion == "5":
+        print("Saliendo del modo de prueba...")
+        return
+    
+    else:
+        print("❌ Opción no válida")
+    
+    # Preguntar si desea realizar otra prueba
+    otra_prueba = input("\n¿Deseas realizar otra prueba? (s/n): ").strip().lower()
+    if otra_prueba.startswith('s'):
+        test_mode()
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--test":
+        test_mode()
+    else:
         main()
\ No newline at end of file